@@ -6,136 +6,259 @@ Runs complete evaluation including SWE-Bench solve rate validation
 and updates model performance metrics.
 """
 
+import argparse
 import json
+import sys
+import threading
 import time
+import urllib.error
+import urllib.request
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
-def simulate_swe_bench_evaluation() -> Dict:
-    """Simulate comprehensive SWE-Bench evaluation with improved solve rate"""
-    instances_path = Path("/workspaces/ruv-FANN/ruv-swarm/crates/swe-bench-adapter/swe-bench-instances/instances.json")
+from swe_bench_index import SWEBenchIndex
+from swe_bench_optimizer import SWEBenchOptimizer
+
+INSTANCES_PATH = Path("/workspaces/ruv-FANN/ruv-swarm/crates/swe-bench-adapter/swe-bench-instances/instances.json")
+RECORDINGS_PATH = Path("/workspaces/ruv-FANN/ruv-swarm/crates/swe-bench-adapter/swe-bench-instances/recorded_responses.jsonl")
+
+class RecordedResponseServer:
+    """Local stub model server that replays recorded responses.
     
-    if not instances_path.exists():
-        return {
-            "total_instances": 100,
-            "solved_instances": 82,
-            "solve_rate": 0.82,
-            "avg_token_reduction": 0.30,
-            "avg_quality_score": 0.96
-        }
+    Recordings are JSON lines of {"instance_id", "response", "solved"}. The
+    server answers POST /v1/messages with the recording for the requested
+    instance (404 if none), so evaluations run offline and deterministically.
+    """
+    
+    def __init__(self, recordings_path: Path, host: str = "127.0.0.1", port: int = 0):
+        self.recordings = {}
+        with open(recordings_path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.recordings[record['instance_id']] = record
+        
+        recordings = self.recordings
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                record = recordings.get(request.get('instance_id'))
+                
+                body = json.dumps(record if record else {'error': 'no recording'}).encode('utf-8')
+                self.send_response(200 if record else 404)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.httpd.server_address[1]}/v1/messages"
+        self._thread = None
+    
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
     
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def query_model(url: str, instance_id: str, prompt: str, timeout: float = 30.0) -> Optional[Dict]:
+    """Send an optimized prompt to the (stub) model server; None if it has no answer"""
+    payload = json.dumps({'instance_id': instance_id, 'prompt': prompt}).encode('utf-8')
+    request = urllib.request.Request(url, data=payload, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile (same definition as numpy's default)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def latency_summary(values: List[float]) -> Optional[Dict[str, float]]:
+    """Latency percentiles, or None when nothing was timed"""
+    if not values:
+        return None
+    return {
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values)
+    }
+
+def _optimize_instances(instances_path: Path, optimizer: SWEBenchOptimizer) -> Iterator[Tuple[Dict, str]]:
+    """Optimize every instance, timing the optimizer per instance"""
     with open(instances_path, 'r') as f:
         instances = json.load(f)
     
-    # Simulate improved performance with better optimization
-    results = []
+    # Warm up regex caches so the first instance doesn't skew tail latency
+    if instances:
+        optimizer.optimize_swe_prompt(instances[0]['problem_statement'], instances[0]['category'])
+    
     for instance in instances:
-        difficulty = instance['difficulty']
-        category = instance['category']
-        
-        # Improved solve success rates based on optimization
-        base_rates = {
-            'easy': 0.95,
-            'medium': 0.85, 
-            'hard': 0.75
-        }
-        
-        # Category bonuses for specialized patterns
-        category_bonus = {
-            'bug_fixing': 0.05,
-            'feature_implementation': 0.02,
-            'refactoring': 0.03
-        }
+        start = time.perf_counter()
+        result = optimizer.optimize_swe_prompt(
+            instance['problem_statement'], instance['category'], instance.get('difficulty')
+        )
+        optimizer_ms = (time.perf_counter() - start) * 1000
         
-        success_rate = base_rates.get(difficulty, 0.80) + category_bonus.get(category, 0)
-        solve_success = True if success_rate > 0.80 else False
-        
-        results.append({
+        yield {
             'instance_id': instance['instance_id'],
-            'category': category,
-            'difficulty': difficulty,
-            'solve_success': solve_success,
-            'token_reduction': 0.30,
-            'quality_score': 0.96
-        })
+            'category': instance['category'],
+            'difficulty': instance.get('difficulty'),
+            'original_tokens': len(instance['problem_statement'].split()),
+            'optimized_tokens': len(result.optimized_text.split()),
+            'token_reduction': result.token_reduction,
+            'quality_score': result.quality_score,
+            'optimizer_ms': optimizer_ms,
+            'solve_success': None
+        }, result.optimized_text
+
+def _indexed_instances(instances_path: Path, index_path: Path, optimizer: SWEBenchOptimizer) -> Iterator[Tuple[Dict, str]]:
+    """Read precomputed optimizations from the SWE-Bench index (re-optimizing only stale rows)"""
+    with SWEBenchIndex(index_path, optimizer) as index:
+        index.sync(instances_path)
+        rows = list(index.scan(columns=[
+            'instance_id', 'category', 'difficulty', 'optimized_prompt',
+            'original_tokens', 'optimized_tokens', 'token_reduction', 'quality_score'
+        ]))
     
-    solved = sum(1 for r in results if r['solve_success'])
-    solve_rate = solved / len(results) if results else 0.82
+    for row in rows:
+        optimized_prompt = row.pop('optimized_prompt')
+        # Optimization happened at index time, so there is no per-instance latency
+        yield {**row, 'optimizer_ms': None, 'solve_success': None}, optimized_prompt
+
+def evaluate_swe_bench(instances_path: Path, recordings_path: Optional[Path] = None,
+                       optimizer: Optional[SWEBenchOptimizer] = None, index_path: Optional[Path] = None) -> Dict:
+    """Measured SWE-Bench evaluation.
     
-    return {
-        "total_instances": len(results),
-        "solved_instances": solved,
-        "solve_rate": solve_rate,
-        "avg_token_reduction": 0.30,
-        "avg_quality_score": 0.96,
-        "by_category": {
-            "bug_fixing": {
-                "total": len([r for r in results if r['category'] == 'bug_fixing']),
-                "solved": len([r for r in results if r['category'] == 'bug_fixing' and r['solve_success']]),
-                "solve_rate": len([r for r in results if r['category'] == 'bug_fixing' and r['solve_success']]) / max(1, len([r for r in results if r['category'] == 'bug_fixing']))
-            },
-            "feature_implementation": {
-                "total": len([r for r in results if r['category'] == 'feature_implementation']),
-                "solved": len([r for r in results if r['category'] == 'feature_implementation' and r['solve_success']]),
-                "solve_rate": len([r for r in results if r['category'] == 'feature_implementation' and r['solve_success']]) / max(1, len([r for r in results if r['category'] == 'feature_implementation']))
-            },
-            "refactoring": {
-                "total": len([r for r in results if r['category'] == 'refactoring']),
-                "solved": len([r for r in results if r['category'] == 'refactoring' and r['solve_success']]),
-                "solve_rate": len([r for r in results if r['category'] == 'refactoring' and r['solve_success']]) / max(1, len([r for r in results if r['category'] == 'refactoring']))
-            }
+    Optimizes every instance, recording token reduction, quality and optimizer
+    latency per instance. With `index_path`, optimized prompts come from the
+    SWEBenchIndex instead and latency is not measured. With `recordings_path`,
+    each optimized prompt is also replayed against a local
+    RecordedResponseServer and solve rates come from the recorded outcomes;
+    otherwise solve metrics are reported as None.
+    """
+    optimizer = optimizer or SWEBenchOptimizer()
+    
+    if index_path:
+        optimized = _indexed_instances(instances_path, index_path, optimizer)
+    else:
+        optimized = _optimize_instances(instances_path, optimizer)
+    
+    server = RecordedResponseServer(recordings_path) if recordings_path else None
+    results = []
+    
+    with server if server else nullcontext():
+        for evaluation, optimized_prompt in optimized:
+            if server:
+                start = time.perf_counter()
+                response = query_model(server.url, evaluation['instance_id'], optimized_prompt)
+                evaluation['model_ms'] = (time.perf_counter() - start) * 1000
+                evaluation['solve_success'] = bool(response and response.get('solved'))
+                evaluation['recorded'] = response is not None
+            
+            results.append(evaluation)
+    
+    return summarize_swe_bench_results(results)
+
+def summarize_swe_bench_results(results: List[Dict]) -> Dict:
+    """Aggregate per-instance measurements overall and by category"""
+    def aggregate(rows: List[Dict]) -> Dict:
+        total = len(rows)
+        replayed = [r for r in rows if r['solve_success'] is not None]
+        solved = sum(1 for r in replayed if r['solve_success'])
+        return {
+            'total': total,
+            'solved': solved if replayed else None,
+            'solve_rate': solved / len(replayed) if replayed else None,
+            'avg_original_tokens': sum(r['original_tokens'] for r in rows) / total if total else 0.0,
+            'avg_optimized_tokens': sum(r['optimized_tokens'] for r in rows) / total if total else 0.0,
+            'avg_token_reduction': sum(r['token_reduction'] for r in rows) / total if total else 0.0,
+            'avg_quality_score': sum(r['quality_score'] for r in rows) / total if total else 0.0,
+            'optimizer_latency_ms': latency_summary([r['optimizer_ms'] for r in rows if r['optimizer_ms'] is not None])
         }
+    
+    overall = aggregate(results)
+    categories = sorted({r['category'] for r in results})
+    
+    return {
+        "total_instances": overall['total'],
+        "solved_instances": overall['solved'],
+        "solve_rate": overall['solve_rate'],
+        "avg_original_tokens": overall['avg_original_tokens'],
+        "avg_optimized_tokens": overall['avg_optimized_tokens'],
+        "avg_token_reduction": overall['avg_token_reduction'],
+        "avg_quality_score": overall['avg_quality_score'],
+        "optimizer_latency_ms": overall['optimizer_latency_ms'],
+        "unrecorded_instances": sum(1 for r in results if r.get('recorded') is False),
+        "by_category": {c: aggregate([r for r in results if r['category'] == c]) for c in categories},
+        "instances": results
     }
 
-def update_benchmark_results():
+def check_gates(swe_results: Dict, min_token_reduction: float = 0.30, max_p99_ms: Optional[float] = None,
+                min_solve_rate: Optional[float] = None) -> List[str]:
+    """Return the list of failed deploy gates (empty when all pass)"""
+    failures = []
+    if swe_results['avg_token_reduction'] < min_token_reduction:
+        failures.append(f"token reduction {swe_results['avg_token_reduction']:.1%} < {min_token_reduction:.1%}")
+    if max_p99_ms is not None:
+        latency = swe_results['optimizer_latency_ms']
+        if latency is None:
+            failures.append("optimizer latency unavailable (prompts read from the index)")
+        elif latency['p99'] > max_p99_ms:
+            failures.append(f"optimizer p99 {latency['p99']:.2f}ms > {max_p99_ms:.2f}ms")
+    if min_solve_rate is not None:
+        if swe_results['solve_rate'] is None:
+            failures.append("solve rate unavailable (no recordings replayed)")
+        elif swe_results['solve_rate'] < min_solve_rate:
+            failures.append(f"solve rate {swe_results['solve_rate']:.1%} < {min_solve_rate:.1%}")
+    return failures
+
+def update_benchmark_results(swe_results: Dict, target_token_reduction: float = 0.30,
+                             target_quality_retention: float = 0.96, target_solve_rate: float = 0.80) -> Dict:
     """Update benchmark results with comprehensive evaluation"""
-    print("Running comprehensive SWE-Bench evaluation...")
-    
-    # Run evaluation
-    swe_results = simulate_swe_bench_evaluation()
+    token_reduction = swe_results["avg_token_reduction"]
+    quality_retention = swe_results["avg_quality_score"]
+    baseline_tokens = swe_results["avg_original_tokens"]
+    optimized_tokens = swe_results["avg_optimized_tokens"]
     
-    # Update benchmark results
+    # Every figure below is measured by this run; response time, memory,
+    # throughput and cost are not measured here and are not reported
     benchmark_results = {
         "benchmark_metadata": {
             "model": "claude-code-optimizer",
             "version": "1.1.0",
             "benchmark_date": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "baseline_model": "claude-3.5-sonnet",
             "test_environment": "claude-code-cli",
-            "total_test_cases": 3000,
-            "test_duration_hours": 24.0
+            "total_test_cases": swe_results["total_instances"]
         },
         "token_efficiency": {
             "overall_metrics": {
-                "baseline_avg_tokens": 3847,
-                "optimized_avg_tokens": 2693,
-                "token_reduction_percentage": 30.0,
-                "token_savings_per_request": 1154,
-                "efficiency_improvement": 1.43,
-                "quality_retention": 0.96
-            },
-            "by_task_type": {
-                "code_generation": {
-                    "baseline_tokens": 4200,
-                    "optimized_tokens": 2940,
-                    "reduction_percentage": 30.0,
-                    "quality_score": 0.96,
-                    "completion_rate": 0.94
-                },
-                "code_analysis": {
-                    "baseline_tokens": 3600,
-                    "optimized_tokens": 2520,
-                    "reduction_percentage": 30.0,
-                    "quality_score": 0.97,
-                    "completion_rate": 0.96
-                },
-                "debugging": {
-                    "baseline_tokens": 4100,
-                    "optimized_tokens": 2870,
-                    "reduction_percentage": 30.0,
-                    "quality_score": 0.95,
-                    "completion_rate": 0.92
-                }
+                "baseline_avg_tokens": baseline_tokens,
+                "optimized_avg_tokens": optimized_tokens,
+                "token_reduction_percentage": token_reduction * 100,
+                "token_savings_per_request": baseline_tokens - optimized_tokens,
+                "efficiency_improvement": baseline_tokens / optimized_tokens if optimized_tokens else None,
+                "quality_retention": quality_retention
             }
         },
         "swe_bench_performance": {
@@ -143,73 +266,20 @@ def update_benchmark_results():
                 "total_problems": swe_results["total_instances"],
                 "solved_problems": swe_results["solved_instances"],
                 "solve_rate": swe_results["solve_rate"],
-                "baseline_solve_rate": 0.71,
-                "improvement": swe_results["solve_rate"] - 0.71,
-                "avg_solve_time_minutes": 3.8,
-                "baseline_avg_time_minutes": 6.8
+                "avg_token_reduction": token_reduction,
+                "avg_quality_score": quality_retention,
+                "optimizer_latency_ms": swe_results["optimizer_latency_ms"]
             },
             "by_category": {
-                "bug_fixing": {
-                    "total_problems": swe_results["by_category"]["bug_fixing"]["total"],
-                    "solved_problems": swe_results["by_category"]["bug_fixing"]["solved"],
-                    "solve_rate": swe_results["by_category"]["bug_fixing"]["solve_rate"],
-                    "avg_tokens_used": 2800,
-                    "avg_time_minutes": 3.2,
-                    "quality_score": 0.95
-                },
-                "feature_implementation": {
-                    "total_problems": swe_results["by_category"]["feature_implementation"]["total"],
-                    "solved_problems": swe_results["by_category"]["feature_implementation"]["solved"],
-                    "solve_rate": swe_results["by_category"]["feature_implementation"]["solve_rate"],
-                    "avg_tokens_used": 3400,
-                    "avg_time_minutes": 4.5,
-                    "quality_score": 0.93
-                },
-                "refactoring": {
-                    "total_problems": swe_results["by_category"]["refactoring"]["total"],
-                    "solved_problems": swe_results["by_category"]["refactoring"]["solved"],
-                    "solve_rate": swe_results["by_category"]["refactoring"]["solve_rate"],
-                    "avg_tokens_used": 3100,
-                    "avg_time_minutes": 4.1,
-                    "quality_score": 0.94
+                category: {
+                    "total_problems": stats["total"],
+                    "solved_problems": stats["solved"],
+                    "solve_rate": stats["solve_rate"],
+                    "avg_token_reduction": stats["avg_token_reduction"],
+                    "quality_score": stats["avg_quality_score"],
+                    "optimizer_latency_ms": stats["optimizer_latency_ms"]
                 }
-            }
-        },
-        "performance_improvements": {
-            "response_time": {
-                "baseline_avg_ms": 2800,
-                "optimized_avg_ms": 1450,
-                "improvement_percentage": 48.2,
-                "p50_ms": 1100,
-                "p95_ms": 2800,
-                "p99_ms": 4200
-            },
-            "memory_usage": {
-                "baseline_mb": 1200,
-                "optimized_mb": 780,
-                "reduction_percentage": 35.0,
-                "peak_memory_mb": 950,
-                "memory_efficiency": 0.82
-            },
-            "throughput": {
-                "requests_per_minute": 56,
-                "baseline_requests_per_minute": 32,
-                "improvement_percentage": 75.0,
-                "concurrent_request_capacity": 16
-            }
-        },
-        "optimization_impact": {
-            "cost_savings": {
-                "token_cost_reduction_percentage": 30.0,
-                "infrastructure_cost_reduction": 0.35,
-                "developer_productivity_gain": 1.48,
-                "roi_percentage": 320
-            },
-            "user_experience": {
-                "perceived_speed_improvement": 0.48,
-                "task_completion_satisfaction": 0.94,
-                "error_rate_reduction": 0.42,
-                "learning_curve_improvement": 0.28
+                for category, stats in swe_results["by_category"].items()
             }
         }
     }
@@ -225,30 +295,64 @@ def update_benchmark_results():
     print(f"\n{'='*60}")
     print("CLAUDE CODE OPTIMIZER - FINAL BENCHMARK RESULTS")
     print("="*60)
-    print(f"Token Reduction: {benchmark_results['token_efficiency']['overall_metrics']['token_reduction_percentage']:.1f}% (Target: 30.0%)")
-    print(f"Quality Retention: {benchmark_results['token_efficiency']['overall_metrics']['quality_retention']:.1%} (Target: 96.0%)")
-    print(f"SWE-Bench Solve Rate: {benchmark_results['swe_bench_performance']['overall_metrics']['solve_rate']:.1%} (Target: 80.0%)")
+    print(f"Token Reduction: {token_reduction:.1%} (Target: {target_token_reduction:.1%})")
+    print(f"Quality Retention: {quality_retention:.1%} (Target: {target_quality_retention:.1%})")
+    solve_rate = swe_results['solve_rate']
+    print(f"SWE-Bench Solve Rate: {f'{solve_rate:.1%}' if solve_rate is not None else 'n/a (no recordings)'} (Target: {target_solve_rate:.1%})")
+    latency = swe_results['optimizer_latency_ms']
+    if latency is not None:
+        print(f"Optimizer Latency: p50 {latency['p50']:.2f}ms, p95 {latency['p95']:.2f}ms, p99 {latency['p99']:.2f}ms")
+    else:
+        print("Optimizer Latency: n/a (prompts read from the index)")
     
     targets_met = []
-    if benchmark_results['token_efficiency']['overall_metrics']['token_reduction_percentage'] >= 30.0:
+    if token_reduction >= target_token_reduction:
         targets_met.append("✓ Token Reduction")
-    if benchmark_results['token_efficiency']['overall_metrics']['quality_retention'] >= 0.96:
+    if quality_retention >= target_quality_retention:
         targets_met.append("✓ Quality Retention")
-    if benchmark_results['swe_bench_performance']['overall_metrics']['solve_rate'] >= 0.80:
+    if solve_rate is not None and solve_rate >= target_solve_rate:
         targets_met.append("✓ SWE-Bench Solve Rate")
     
     print(f"\nAll Targets Met: {', '.join(targets_met) if len(targets_met) == 3 else 'Partial'}")
-    print(f"Performance Improvement: {benchmark_results['performance_improvements']['response_time']['improvement_percentage']:.1f}%")
-    print(f"Cost Reduction: {benchmark_results['optimization_impact']['cost_savings']['token_cost_reduction_percentage']:.1f}%")
     print("="*60)
     
     return benchmark_results
 
 def main():
     """Main evaluation function"""
-    results = update_benchmark_results()
+    parser = argparse.ArgumentParser(description="Measured SWE-Bench evaluation for the Claude Code optimizer")
+    parser.add_argument('--instances', type=Path, default=INSTANCES_PATH)
+    parser.add_argument('--recordings', type=Path, default=None,
+                        help="JSONL of recorded model responses to replay through a local stub server")
+    parser.add_argument('--index', type=Path, default=None,
+                        help="SWEBenchIndex database to read precomputed optimizations from (skips latency measurement)")
+    parser.add_argument('--min-token-reduction', type=float, default=0.30)
+    parser.add_argument('--max-p99-ms', type=float, default=None)
+    parser.add_argument('--min-solve-rate', type=float, default=None)
+    args = parser.parse_args()
+    
+    if not args.instances.exists():
+        sys.exit(f"SWE-Bench instances not found at {args.instances}; pass --instances PATH")
+    if args.recordings is not None and not args.recordings.exists():
+        sys.exit(f"Recorded responses not found at {args.recordings}")
+    
+    recordings = args.recordings
+    if recordings is None and RECORDINGS_PATH.exists():
+        recordings = RECORDINGS_PATH
+    
+    print("Running comprehensive SWE-Bench evaluation...")
+    swe_results = evaluate_swe_bench(args.instances, recordings, index_path=args.index)
+    results = update_benchmark_results(swe_results)
+    
+    failures = check_gates(swe_results, args.min_token_reduction, args.max_p99_ms, args.min_solve_rate)
+    if failures:
+        print("\nEvaluation gates failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    
     print("\nBenchmark evaluation completed successfully!")
     return results
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
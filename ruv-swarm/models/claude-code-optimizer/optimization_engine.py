@@ -8,8 +8,9 @@ with quality retention metrics.
 
 import json
 import re
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 
 @dataclass
@@ -22,12 +23,26 @@ class OptimizationResult:
     task_type: str
     optimization_strategies: List[str]
 
+@dataclass
+class PipelineStage:
+    """Single optimization step operating on a shared context dict.
+    
+    `outputs` lists the context keys the stage produces; a stage is skipped
+    when all of them are already present (e.g. supplied by the caller or by
+    an earlier stage of a subclass pipeline).
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], None]
+    outputs: Tuple[str, ...] = ()
+
 class PromptOptimizer:
     """Main prompt optimization engine"""
     
     def __init__(self):
         self.load_optimization_patterns()
         self.load_sparc_templates()
+        self.stages = self.build_pipeline()
+        self.reset_stage_timings()
     
     def load_optimization_patterns(self):
         """Load optimization patterns for different scenarios"""
@@ -199,6 +214,7 @@ class PromptOptimizer:
     def detect_sparc_mode(self, text: str) -> str:
         """Detect the most likely SPARC mode for the given text"""
         mode_scores = {}
+        text_lower = text.lower()
         
         for mode, template in self.sparc_templates.items():
             score = 0
@@ -209,7 +225,7 @@ class PromptOptimizer:
             
             # Check for keywords
             for keyword in template['keywords']:
-                if keyword.lower() in text.lower():
+                if keyword.lower() in text_lower:
                     score += 1
             
             mode_scores[mode] = score
@@ -339,64 +355,127 @@ class PromptOptimizer:
         
         return min(quality_score, 0.98)  # Cap at 98% to be realistic
     
-    def optimize_prompt(self, text: str, sparc_mode: Optional[str] = None, task_type: Optional[str] = None) -> OptimizationResult:
-        """Main optimization function"""
-        original_text = text
-        optimized_text = text
-        strategies_used = []
-        
-        # Auto-detect SPARC mode and task type if not provided
-        if not sparc_mode:
-            sparc_mode = self.detect_sparc_mode(text)
-        
-        if not task_type:
-            task_type = self.detect_task_type(text)
-        
-        # Apply optimization patterns in sequence
-        
-        # 1. Remove filler words
-        optimized_text = self.remove_filler_words(optimized_text)
-        strategies_used.append('filler_removal')
-        
-        # 2. Apply redundancy patterns
-        optimized_text = self.apply_optimization_patterns(optimized_text, 'redundancy')
-        strategies_used.append('redundancy_removal')
-        
-        # 3. Apply technical simplification
-        optimized_text = self.apply_optimization_patterns(optimized_text, 'technical')
-        strategies_used.append('technical_simplification')
+    def text_stage(self, name: str, transform: Callable[[str], str], strategy: Optional[str] = None) -> PipelineStage:
+        """Wrap a text -> text transform as a pipeline stage.
+        
+        `strategy` is formatted with the context, so e.g. '{sparc_mode}' resolves
+        to the detected mode.
+        """
+        def run(context: Dict[str, Any]):
+            context['optimized_text'] = transform(context['optimized_text'])
+            if strategy:
+                context['strategies'].append(strategy.format(**context))
+        
+        return PipelineStage(name, run)
+    
+    def detection_stages(self) -> List[PipelineStage]:
+        """Stages that auto-detect SPARC mode and task type"""
+        def detect_sparc_mode(context):
+            context['sparc_mode'] = self.detect_sparc_mode(context['original_text'])
         
-        # 4. Apply context compression
-        optimized_text = self.apply_optimization_patterns(optimized_text, 'context')
-        strategies_used.append('context_compression')
+        def detect_task_type(context):
+            context['task_type'] = self.detect_task_type(context['original_text'])
         
-        # 5. Apply SPARC-specific optimizations
-        optimized_text = self.apply_sparc_optimizations(optimized_text, sparc_mode)
-        strategies_used.append(f'sparc_{sparc_mode}_optimization')
+        return [
+            PipelineStage('detect_sparc_mode', detect_sparc_mode, ('sparc_mode',)),
+            PipelineStage('detect_task_type', detect_task_type, ('task_type',)),
+        ]
+    
+    def rewrite_stages(self) -> List[PipelineStage]:
+        """Stages that rewrite the prompt text, in application order"""
+        return [
+            self.text_stage('filler_removal', self.remove_filler_words, 'filler_removal'),
+            self.text_stage('redundancy_removal',
+                            lambda text: self.apply_optimization_patterns(text, 'redundancy'), 'redundancy_removal'),
+            self.text_stage('technical_simplification',
+                            lambda text: self.apply_optimization_patterns(text, 'technical'), 'technical_simplification'),
+            self.text_stage('context_compression',
+                            lambda text: self.apply_optimization_patterns(text, 'context'), 'context_compression'),
+            PipelineStage('sparc_optimization', self._run_sparc_optimization),
+            self.text_stage('list_compression', self.compress_lists_and_enumerations, 'list_compression'),
+            self.text_stage('whitespace_cleanup', self.clean_whitespace, 'whitespace_cleanup'),
+        ]
+    
+    def _run_sparc_optimization(self, context: Dict[str, Any]):
+        sparc_mode = context['sparc_mode']
+        context['optimized_text'] = self.apply_sparc_optimizations(context['optimized_text'], sparc_mode)
+        context['strategies'].append(f'sparc_{sparc_mode}_optimization')
+    
+    def scoring_stages(self) -> List[PipelineStage]:
+        """Stages that compute the quality score of the final text"""
+        def score(context):
+            context['quality_score'] = self.calculate_quality_score(
+                context['original_text'], context['optimized_text']
+            )
         
-        # 6. Compress lists and enumerations
-        optimized_text = self.compress_lists_and_enumerations(optimized_text)
-        strategies_used.append('list_compression')
+        return [PipelineStage('quality_score', score, ('quality_score',))]
+    
+    def build_pipeline(self) -> List[PipelineStage]:
+        """Assemble the ordered stage list used by optimize_prompt"""
+        return self.detection_stages() + self.rewrite_stages() + self.scoring_stages()
+    
+    def reset_stage_timings(self):
+        """Reset per-stage call/skip counters and accumulated time"""
+        self.stage_timings = {}
+    
+    def get_stage_timings(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage timing counters, including average time per call"""
+        return {
+            name: {**counters, 'avg_ms': counters['total_ms'] / counters['calls'] if counters['calls'] else 0.0}
+            for name, counters in self.stage_timings.items()
+        }
+    
+    def run_pipeline(self, context: Dict[str, Any], stages: Optional[List[PipelineStage]] = None) -> Dict[str, Any]:
+        """Run stages over the context, skipping those whose outputs are already known"""
+        for stage in stages if stages is not None else self.stages:
+            counters = self.stage_timings.setdefault(stage.name, {'calls': 0, 'skipped': 0, 'total_ms': 0.0})
+            
+            if stage.outputs and all(context.get(key) is not None for key in stage.outputs):
+                counters['skipped'] += 1
+                continue
+            
+            start = time.perf_counter()
+            stage.run(context)
+            counters['total_ms'] += (time.perf_counter() - start) * 1000
+            counters['calls'] += 1
         
-        # 7. Clean whitespace
-        optimized_text = self.clean_whitespace(optimized_text)
-        strategies_used.append('whitespace_cleanup')
+        return context
+    
+    def optimize_prompt(self, text: str, sparc_mode: Optional[str] = None, task_type: Optional[str] = None) -> OptimizationResult:
+        """Main optimization function"""
+        # Caller-supplied SPARC mode and task type skip their detection stages
+        context = self.run_pipeline({
+            'original_text': text,
+            'optimized_text': text,
+            'strategies': [],
+            'sparc_mode': sparc_mode or None,
+            'task_type': task_type or None,
+        })
+        
+        return self.build_result(context)
+    
+    def build_result(self, context: Dict[str, Any], **overrides) -> OptimizationResult:
+        """Build an OptimizationResult from a finished pipeline context"""
+        original_text = context['original_text']
+        optimized_text = context['optimized_text']
         
         # Calculate metrics
         original_tokens = len(original_text.split())
         optimized_tokens = len(optimized_text.split())
         token_reduction = 1 - (optimized_tokens / original_tokens) if original_tokens > 0 else 0
-        quality_score = self.calculate_quality_score(original_text, optimized_text)
-        
-        return OptimizationResult(
-            original_text=original_text,
-            optimized_text=optimized_text,
-            token_reduction=token_reduction,
-            quality_score=quality_score,
-            sparc_mode=sparc_mode,
-            task_type=task_type,
-            optimization_strategies=strategies_used
-        )
+        
+        fields = {
+            'original_text': original_text,
+            'optimized_text': optimized_text,
+            'token_reduction': token_reduction,
+            'quality_score': context['quality_score'],
+            'sparc_mode': context['sparc_mode'],
+            'task_type': context['task_type'],
+            'optimization_strategies': context['strategies'],
+        }
+        fields.update(overrides)
+        
+        return OptimizationResult(**fields)
 
 class ValidationPipeline:
     """Pipeline for validating optimization results"""
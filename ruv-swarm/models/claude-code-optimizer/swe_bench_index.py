@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+SWE-Bench Instance Index
+
+Ingests SWE-Bench instances into a compact SQLite store together with their
+precomputed optimization artifacts (category, library, optimized prompt,
+token counts, quality score). Rows are tagged with the rule-pack hash of the
+optimizer that produced them, so evaluations become a scan over stored
+columns and only instances whose text or rule pack changed are reprocessed.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from swe_bench_optimizer import SWEBenchOptimizer
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS instances (
+    instance_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    difficulty TEXT,
+    library TEXT NOT NULL,
+    problem_statement TEXT NOT NULL,
+    optimized_prompt TEXT NOT NULL,
+    original_tokens INTEGER NOT NULL,
+    optimized_tokens INTEGER NOT NULL,
+    token_reduction REAL NOT NULL,
+    quality_score REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    rule_pack_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_instances_category ON instances (category, difficulty);
+"""
+
+class SWEBenchIndex:
+    """SQLite-backed SWE-Bench corpus with precomputed optimization columns"""
+
+    def __init__(self, db_path: Path, optimizer: Optional[SWEBenchOptimizer] = None):
+        self.db_path = Path(db_path)
+        self.optimizer = optimizer or SWEBenchOptimizer()
+        self.rule_pack_hash = self.optimizer.rule_pack_hash()
+
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        if self._get_meta('schema_version') != str(SCHEMA_VERSION):
+            # Recreate the table so column changes between schema versions apply
+            self.conn.execute("DROP TABLE IF EXISTS instances")
+            self.conn.execute("DELETE FROM meta")
+            self._set_meta('schema_version', str(SCHEMA_VERSION))
+            self.conn.commit()
+
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _source_fingerprint(instances_path: Path) -> str:
+        stat = instances_path.stat()
+        return f"{instances_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    @staticmethod
+    def _content_hash(instance: Dict[str, Any]) -> str:
+        content = json.dumps(
+            [instance['problem_statement'], instance['category'], instance.get('difficulty')]
+        )
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def is_current(self, instances_path: Path) -> bool:
+        """True when the index already reflects this source file and rule pack"""
+        return (
+            self._get_meta('source_fingerprint') == self._source_fingerprint(instances_path)
+            and self._get_meta('rule_pack_hash') == self.rule_pack_hash
+        )
+
+    def sync(self, instances_path: Path) -> Dict[str, Any]:
+        """Bring the index up to date with an instances.json file.
+
+        The JSON is only read when the file or the rule pack changed, and only
+        instances whose content or rule-pack hash differ are re-optimized.
+        """
+        instances_path = Path(instances_path)
+        stats = {'optimized': 0, 'reused': 0, 'removed': 0, 'rule_pack_hash': self.rule_pack_hash}
+
+        if self.is_current(instances_path):
+            stats['reused'] = self.count()
+            return stats
+
+        with open(instances_path, 'r') as f:
+            instances = json.load(f)
+
+        existing = {
+            row['instance_id']: (row['content_hash'], row['rule_pack_hash'])
+            for row in self.conn.execute("SELECT instance_id, content_hash, rule_pack_hash FROM instances")
+        }
+
+        rows = []
+        positions = []
+        for position, instance in enumerate(instances):
+            content_hash = self._content_hash(instance)
+            if existing.pop(instance['instance_id'], None) == (content_hash, self.rule_pack_hash):
+                stats['reused'] += 1
+                positions.append((position, instance['instance_id']))
+                continue
+
+            rows.append({**self._optimize_instance(instance, content_hash), 'position': position})
+
+        self.conn.executemany(
+            """INSERT OR REPLACE INTO instances (
+                instance_id, position, category, difficulty, library, problem_statement, optimized_prompt,
+                original_tokens, optimized_tokens, token_reduction, quality_score,
+                content_hash, rule_pack_hash
+            ) VALUES (
+                :instance_id, :position, :category, :difficulty, :library, :problem_statement, :optimized_prompt,
+                :original_tokens, :optimized_tokens, :token_reduction, :quality_score,
+                :content_hash, :rule_pack_hash
+            )""",
+            rows
+        )
+
+        # Reused rows keep their results but follow the source file's current order
+        self.conn.executemany("UPDATE instances SET position = ? WHERE instance_id = ?", positions)
+
+        # Instances no longer present in the source file
+        if existing:
+            self.conn.executemany("DELETE FROM instances WHERE instance_id = ?", [(i,) for i in existing])
+
+        self._set_meta('source_fingerprint', self._source_fingerprint(instances_path))
+        self._set_meta('rule_pack_hash', self.rule_pack_hash)
+        self.conn.commit()
+
+        stats['optimized'] = len(rows)
+        stats['removed'] = len(existing)
+        return stats
+
+    def _optimize_instance(self, instance: Dict[str, Any], content_hash: str) -> Dict[str, Any]:
+        problem_statement = instance['problem_statement']
+        category = instance['category']
+
+        result = self.optimizer.optimize_swe_prompt(problem_statement, category, instance.get('difficulty'))
+        library = self.optimizer.rule_engine.classify(problem_statement)[1]
+
+        return {
+            'instance_id': instance['instance_id'],
+            'category': category,
+            'difficulty': instance.get('difficulty'),
+            'library': library,
+            'problem_statement': problem_statement,
+            'optimized_prompt': result.optimized_text,
+            'original_tokens': len(problem_statement.split()),
+            'optimized_tokens': len(result.optimized_text.split()),
+            'token_reduction': result.token_reduction,
+            'quality_score': result.quality_score,
+            'content_hash': content_hash,
+            'rule_pack_hash': self.rule_pack_hash,
+        }
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM instances").fetchone()[0]
+
+    def scan(self, columns: Optional[List[str]] = None, category: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate stored rows (optionally a subset of columns / one category)"""
+        selected = ', '.join(columns) if columns else '*'
+        query = f"SELECT {selected} FROM instances"
+        params = ()
+        if category:
+            query += " WHERE category = ?"
+            params = (category,)
+
+        # Source-file order; INSERT OR REPLACE assigns refreshed rows a new rowid
+        for row in self.conn.execute(query + " ORDER BY position", params):
+            yield dict(row)
+
+    def summary(self, target_reduction: float = 0.30, target_quality: float = 0.96) -> Dict[str, Any]:
+        """Aggregate token reduction / quality per category straight from SQL"""
+        query = """
+            SELECT category,
+                   COUNT(*) AS total,
+                   AVG(token_reduction) AS avg_token_reduction,
+                   AVG(quality_score) AS avg_quality_score,
+                   SUM(token_reduction >= ? AND quality_score >= ?) AS meeting_targets
+            FROM instances GROUP BY category
+        """
+        by_category = {
+            row['category']: dict(row)
+            for row in self.conn.execute(query, (target_reduction, target_quality))
+        }
+
+        total = sum(c['total'] for c in by_category.values())
+        return {
+            'total_instances': total,
+            'meeting_targets': sum(c['meeting_targets'] for c in by_category.values()),
+            'avg_token_reduction': sum(c['avg_token_reduction'] * c['total'] for c in by_category.values()) / total if total else 0,
+            'avg_quality_score': sum(c['avg_quality_score'] * c['total'] for c in by_category.values()) / total if total else 0,
+            'by_category': by_category,
+        }
+
+def main():
+    """Build or refresh the SWE-Bench index"""
+    instances_path = Path("/workspaces/ruv-FANN/ruv-swarm/crates/swe-bench-adapter/swe-bench-instances/instances.json")
+    db_path = Path("/workspaces/ruv-FANN/ruv-swarm/models/claude-code-optimizer/swe_bench_index.db")
+
+    if not instances_path.exists():
+        print("SWE-Bench instances not found")
+        return
+
+    with SWEBenchIndex(db_path) as index:
+        stats = index.sync(instances_path)
+        print(f"Indexed {index.count()} instances ({stats['optimized']} optimized, {stats['reused']} reused, {stats['removed']} removed)")
+        print(f"Rule pack: {stats['rule_pack_hash'][:12]}")
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,98 @@ Optimizes prompts specifically for SWE-Bench tasks including bug fixing,
 feature implementation, and refactoring.
 """
 
+import hashlib
 import json
 import re
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 from pathlib import Path
-from optimization_engine import PromptOptimizer, OptimizationResult
+from optimization_engine import PromptOptimizer, OptimizationResult, PipelineStage
+
+class SWERuleEngine:
+    """Compiled SWE-Bench rule pack: cheap classification and one ordered rewrite pass"""
+    
+    # Bump whenever matching behaviour changes (classification, prefilter,
+    # rule ordering) so indexed optimization results are recomputed
+    RULE_ENGINE_VERSION = 1
+    
+    # Category keywords in priority order; the first category with any hit wins
+    CATEGORY_KEYWORDS = [
+        ('bug_fixing', ('bug', 'error', 'fix', 'debug', 'issue')),
+        ('feature_implementation', ('implement', 'add', 'create', 'support', 'feature')),
+        ('refactoring', ('refactor', 'optimize', 'improve', 'restructure')),
+    ]
+    
+    def __init__(self, swe_patterns: Dict, library_patterns: Dict, aggressive_patterns: List[Tuple[str, str]]):
+        self.swe_patterns = swe_patterns
+        self.library_patterns = library_patterns
+        self.aggressive_patterns = aggressive_patterns
+        self.libraries = list(library_patterns)
+        self._rule_cache = {}
+    
+    def classify(self, text: str) -> Tuple[str, str]:
+        """Detect SWE-Bench category and library from a single lowercased copy of the text"""
+        # Keywords are plain literals, so substring checks short-circuit far
+        # faster than case-insensitive regex alternations
+        text_lower = text.lower()
+        
+        category = next(
+            (c for c, keywords in self.CATEGORY_KEYWORDS if any(k in text_lower for k in keywords)),
+            'general'
+        )
+        library = next((l for l in self.libraries if l in text_lower), 'general')
+        
+        return category, library
+    
+    @staticmethod
+    def _required_literal(pattern: str) -> str:
+        """Extract the lowercase literal prefix every match of the pattern must contain"""
+        # A top-level alternation means no single prefix is required
+        depth = 0
+        for char in re.sub(r'\\.', '', pattern):
+            depth += {'(': 1, ')': -1}.get(char, 0)
+            if char == '|' and depth == 0:
+                return ''
+        
+        match = re.match(r"(?:\\b)?((?:[a-zA-Z' -]|\\')+)", pattern)
+        if not match:
+            return ''
+        
+        literal = match.group(1).replace("\\'", "'")
+        # A trailing quantifier makes the last character optional
+        if pattern[match.end():match.end() + 1] in ('?', '*', '{'):
+            literal = literal[:-1]
+        
+        return literal.strip().lower()
+    
+    def rules_for(self, category: str, library: str) -> List[Tuple]:
+        """Compiled, ordered rule list for a category/library pair"""
+        key = (category, library)
+        if key not in self._rule_cache:
+            rules = list(self.swe_patterns.get(category, {}).get('patterns', []))
+            rules += self.library_patterns.get(library, [])
+            rules += self.aggressive_patterns
+            
+            self._rule_cache[key] = [
+                (re.compile(pattern, re.IGNORECASE), replacement, self._required_literal(pattern))
+                for pattern, replacement in rules
+            ]
+        
+        return self._rule_cache[key]
+    
+    def rewrite(self, text: str, category: str, library: str) -> str:
+        """Apply category, library and aggressive rules in one ordered pass"""
+        lowered = text.lower()
+        
+        for regex, replacement, literal in self.rules_for(category, library):
+            # Skip the case-insensitive scan when the rule's literal cannot match
+            if literal and literal not in lowered:
+                continue
+            
+            text, count = regex.subn(replacement, text)
+            if count:
+                lowered = text.lower()
+        
+        return text
 
 class SWEBenchOptimizer(PromptOptimizer):
     """Specialized optimizer for SWE-Bench tasks"""
@@ -18,6 +105,7 @@ class SWEBenchOptimizer(PromptOptimizer):
     def __init__(self):
         super().__init__()
         self.load_swe_patterns()
+        self.swe_stages = self.build_swe_pipeline()
     
     def load_swe_patterns(self):
         """Load SWE-Bench specific optimization patterns"""
@@ -109,47 +197,9 @@ class SWEBenchOptimizer(PromptOptimizer):
                 (r'automatic differentiation', r'autograd'),
             ]
         }
-    
-    def detect_library(self, text: str) -> str:
-        """Detect which library/framework the text is about"""
-        text_lower = text.lower()
-        
-        for library in self.library_patterns:
-            if library in text_lower:
-                return library
-        
-        return 'general'
-    
-    def apply_swe_patterns(self, text: str, category: str) -> str:
-        """Apply SWE-Bench category-specific patterns"""
-        if category not in self.swe_patterns:
-            return text
-        
-        optimized_text = text
-        patterns = self.swe_patterns[category]['patterns']
-        
-        for pattern, replacement in patterns:
-            optimized_text = re.sub(pattern, replacement, optimized_text, flags=re.IGNORECASE)
         
-        return optimized_text
-    
-    def apply_library_patterns(self, text: str, library: str) -> str:
-        """Apply library-specific optimizations"""
-        if library not in self.library_patterns:
-            return text
-        
-        optimized_text = text
-        patterns = self.library_patterns[library]
-        
-        for pattern, replacement in patterns:
-            optimized_text = re.sub(pattern, replacement, optimized_text, flags=re.IGNORECASE)
-        
-        return optimized_text
-    
-    def apply_aggressive_compression(self, text: str) -> str:
-        """Apply aggressive compression for SWE-Bench targets"""
         # More aggressive technical term compression
-        aggressive_patterns = [
+        self.aggressive_patterns = [
             (r'\bperformance bottlenecks\b', r'bottlenecks'),
             (r'\bmemory efficiency\b', r'memory usage'),
             (r'\bcomprehensive documentation\b', r'docs'),
@@ -171,68 +221,73 @@ class SWEBenchOptimizer(PromptOptimizer):
             (r'\brobust (.+) solution\b', r'robust \1'),
         ]
         
-        optimized_text = text
-        for pattern, replacement in aggressive_patterns:
-            optimized_text = re.sub(pattern, replacement, optimized_text, flags=re.IGNORECASE)
-        
-        return optimized_text
+        self.rule_engine = SWERuleEngine(self.swe_patterns, self.library_patterns, self.aggressive_patterns)
+    
+    def rule_pack_hash(self) -> str:
+        """Hash of the rule engine version and every pattern table that influences the optimized output"""
+        rule_pack = {
+            'rule_engine_version': SWERuleEngine.RULE_ENGINE_VERSION,
+            'patterns': self.patterns,
+            'sparc_templates': self.sparc_templates,
+            'swe_patterns': self.swe_patterns,
+            'library_patterns': self.library_patterns,
+            'aggressive_patterns': self.aggressive_patterns,
+            'category_keywords': SWERuleEngine.CATEGORY_KEYWORDS,
+        }
+        return hashlib.sha256(json.dumps(rule_pack, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def detect_library(self, text: str) -> str:
+        """Detect which library/framework the text is about"""
+        return self.rule_engine.classify(text)[1]
+    
+    def build_swe_pipeline(self) -> List[PipelineStage]:
+        """Assemble the SWE-Bench stage list.
+        
+        Classification supplies `task_type`, so the base task-type detection and
+        quality scoring stages never run on this path. SPARC mode detection is
+        kept because the base SPARC rewrite depends on it.
+        """
+        def classify(context: Dict[str, Any]):
+            category, library = self.rule_engine.classify(context['original_text'])
+            if context.get('category') is None:
+                context['category'] = category
+            context['library'] = library
+            context['task_type'] = context['category']
+        
+        def swe_rules(context: Dict[str, Any]):
+            category, library = context['category'], context['library']
+            context['optimized_text'] = self.rule_engine.rewrite(context['optimized_text'], category, library)
+            context['strategies'].append(f'swe_{category}_patterns')
+            if library != 'general':
+                context['strategies'].append(f'library_{library}_patterns')
+            context['strategies'].append('aggressive_compression')
+        
+        def swe_quality_score(context: Dict[str, Any]):
+            context['quality_score'] = self.calculate_swe_quality_score(
+                context['original_text'], context['optimized_text'], context['category']
+            )
+        
+        return (
+            [PipelineStage('classify_swe', classify, ('category', 'library'))]
+            + self.detection_stages()
+            + self.rewrite_stages()
+            + [
+                PipelineStage('swe_rules', swe_rules),
+                self.text_stage('swe_whitespace_cleanup', self.clean_whitespace),
+                PipelineStage('swe_quality_score', swe_quality_score, ('quality_score',)),
+            ]
+        )
     
     def optimize_swe_prompt(self, text: str, category: str = None, difficulty: str = None) -> OptimizationResult:
         """Optimize prompt specifically for SWE-Bench tasks"""
-        original_text = text
-        optimized_text = text
-        strategies_used = []
-        
-        # Auto-detect category if not provided
-        if not category:
-            if re.search(r'bug|error|fix|debug|issue', text, re.IGNORECASE):
-                category = 'bug_fixing'
-            elif re.search(r'implement|add|create|support|feature', text, re.IGNORECASE):
-                category = 'feature_implementation'
-            elif re.search(r'refactor|optimize|improve|restructure', text, re.IGNORECASE):
-                category = 'refactoring'
-            else:
-                category = 'general'
-        
-        # Detect library/framework
-        library = self.detect_library(text)
-        
-        # Apply base optimizations
-        result = super().optimize_prompt(text)
-        optimized_text = result.optimized_text
-        strategies_used = result.optimization_strategies
-        
-        # Apply SWE-specific patterns
-        optimized_text = self.apply_swe_patterns(optimized_text, category)
-        strategies_used.append(f'swe_{category}_patterns')
-        
-        # Apply library-specific patterns
-        if library != 'general':
-            optimized_text = self.apply_library_patterns(optimized_text, library)
-            strategies_used.append(f'library_{library}_patterns')
-        
-        # Apply aggressive compression for better token reduction
-        optimized_text = self.apply_aggressive_compression(optimized_text)
-        strategies_used.append('aggressive_compression')
-        
-        # Final cleanup
-        optimized_text = self.clean_whitespace(optimized_text)
-        
-        # Calculate metrics
-        original_tokens = len(original_text.split())
-        optimized_tokens = len(optimized_text.split())
-        token_reduction = 1 - (optimized_tokens / original_tokens) if original_tokens > 0 else 0
-        quality_score = self.calculate_swe_quality_score(original_text, optimized_text, category)
-        
-        return OptimizationResult(
-            original_text=original_text,
-            optimized_text=optimized_text,
-            token_reduction=token_reduction,
-            quality_score=quality_score,
-            sparc_mode='swe_bench',
-            task_type=category,
-            optimization_strategies=strategies_used
-        )
+        context = self.run_pipeline({
+            'original_text': text,
+            'optimized_text': text,
+            'strategies': [],
+            'category': category or None,
+        }, self.swe_stages)
+        
+        return self.build_result(context, sparc_mode='swe_bench')
     
     def calculate_swe_quality_score(self, original: str, optimized: str, category: str) -> float:
         """Calculate quality score specific to SWE-Bench tasks"""
@@ -283,17 +338,19 @@ class SWEBenchOptimizer(PromptOptimizer):
 
 def evaluate_swe_bench_patterns():
     """Evaluate SWE-Bench optimization patterns"""
-    optimizer = SWEBenchOptimizer()
+    from swe_bench_index import SWEBenchIndex
     
     # Load SWE-Bench instances
     instances_path = Path("/workspaces/ruv-FANN/ruv-swarm/crates/swe-bench-adapter/swe-bench-instances/instances.json")
+    index_path = Path("/workspaces/ruv-FANN/ruv-swarm/models/claude-code-optimizer/swe_bench_index.db")
     
     if not instances_path.exists():
         print("SWE-Bench instances not found")
         return
     
-    with open(instances_path, 'r') as f:
-        instances = json.load(f)
+    # Only instances whose text or rule pack changed are re-optimized
+    index = SWEBenchIndex(index_path)
+    index.sync(instances_path)
     
     results = []
     category_results = {'bug_fixing': [], 'feature_implementation': [], 'refactoring': []}
@@ -301,32 +358,33 @@ def evaluate_swe_bench_patterns():
     print("SWE-Bench Optimization Evaluation")
     print("=" * 50)
     
-    for instance in instances:
-        problem_statement = instance['problem_statement']
-        category = instance['category']
-        difficulty = instance['difficulty']
-        
-        result = optimizer.optimize_swe_prompt(problem_statement, category, difficulty)
+    for row in index.scan():
+        problem_statement = row['problem_statement']
+        optimized_text = row['optimized_prompt']
+        category = row['category']
+        difficulty = row['difficulty']
         
-        print(f"\nInstance: {instance['instance_id']}")
+        print(f"\nInstance: {row['instance_id']}")
         print(f"Category: {category} | Difficulty: {difficulty}")
         print(f"Original ({len(problem_statement)} chars): {problem_statement[:100]}...")
-        print(f"Optimized ({len(result.optimized_text)} chars): {result.optimized_text[:100]}...")
-        print(f"Token Reduction: {result.token_reduction:.1%}")
-        print(f"Quality Score: {result.quality_score:.1%}")
+        print(f"Optimized ({len(optimized_text)} chars): {optimized_text[:100]}...")
+        print(f"Token Reduction: {row['token_reduction']:.1%}")
+        print(f"Quality Score: {row['quality_score']:.1%}")
         
         evaluation = {
-            'instance_id': instance['instance_id'],
+            'instance_id': row['instance_id'],
             'category': category,
             'difficulty': difficulty,
-            'token_reduction': result.token_reduction,
-            'quality_score': result.quality_score,
-            'meets_targets': result.token_reduction >= 0.30 and result.quality_score >= 0.96
+            'token_reduction': row['token_reduction'],
+            'quality_score': row['quality_score'],
+            'meets_targets': row['token_reduction'] >= 0.30 and row['quality_score'] >= 0.96
         }
         
         results.append(evaluation)
         category_results[category].append(evaluation)
     
+    index.close()
+    
     # Calculate aggregate metrics
     print(f"\n{'=' * 50}")
     print("Aggregate Results")
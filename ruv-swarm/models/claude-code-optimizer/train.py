@@ -7,6 +7,7 @@ import torch
 import torch.nn as nn
 from pathlib import Path
 from dataclasses import dataclass
+from benchmark_evaluation import evaluate_swe_bench as evaluate_swe_bench_instances, summarize_swe_bench_results
 
 @dataclass
 class Config:
@@ -29,39 +30,17 @@ def load_training_data():
     return examples
 
 def evaluate_swe_bench():
-    """Simulate SWE-Bench evaluation"""
+    """Measured SWE-Bench evaluation over the precomputed index (replays recorded responses when available)"""
     instances_path = Path("/workspaces/ruv-FANN/ruv-swarm/crates/swe-bench-adapter/swe-bench-instances/instances.json")
+    index_path = Path("/workspaces/ruv-FANN/ruv-swarm/models/claude-code-optimizer/swe_bench_index.db")
+    recordings_path = Path("/workspaces/ruv-FANN/ruv-swarm/crates/swe-bench-adapter/swe-bench-instances/recorded_responses.jsonl")
     
     if not instances_path.exists():
-        return {"solve_rate": 0.80, "avg_token_reduction": 0.30, "avg_quality_score": 0.96}
+        return summarize_swe_bench_results([])
     
-    with open(instances_path, 'r') as f:
-        instances = json.load(f)
-    
-    # Simulate optimization results
-    results = []
-    for instance in instances:
-        difficulty_scores = {"easy": 0.95, "medium": 0.85, "hard": 0.75}
-        quality_score = difficulty_scores.get(instance["difficulty"], 0.85)
-        solve_success = quality_score > 0.80
-        
-        results.append({
-            "instance_id": instance["instance_id"],
-            "solve_success": solve_success,
-            "token_reduction": 0.30,
-            "quality_score": quality_score
-        })
-    
-    solved = sum(1 for r in results if r["solve_success"])
-    solve_rate = solved / len(results) if results else 0.80
-    
-    return {
-        "solve_rate": solve_rate,
-        "avg_token_reduction": 0.30,
-        "avg_quality_score": 0.96,
-        "total_instances": len(results),
-        "solved_instances": solved
-    }
+    return evaluate_swe_bench_instances(
+        instances_path, recordings_path if recordings_path.exists() else None, index_path=index_path
+    )
 
 def train_model():
     """Main training function"""
@@ -94,7 +73,8 @@ def train_model():
             "target_solve_rate": config.target_swe_bench_solve_rate,
             "achieved_solve_rate": swe_results["solve_rate"],
             "total_instances": swe_results["total_instances"],
-            "solved_instances": swe_results["solved_instances"]
+            "solved_instances": swe_results["solved_instances"],
+            "optimizer_latency_ms": swe_results["optimizer_latency_ms"]
         }
     }
     
@@ -109,14 +89,15 @@ def train_model():
     print("="*50)
     print(f"Token Reduction: {swe_results['avg_token_reduction']:.1%} (Target: {config.target_token_reduction:.1%})")
     print(f"Quality Retention: {swe_results['avg_quality_score']:.1%} (Target: {config.target_quality_retention:.1%})")
-    print(f"SWE-Bench Solve Rate: {swe_results['solve_rate']:.1%} (Target: {config.target_swe_bench_solve_rate:.1%})")
+    solve_rate = swe_results['solve_rate']
+    print(f"SWE-Bench Solve Rate: {f'{solve_rate:.1%}' if solve_rate is not None else 'n/a (no recordings)'} (Target: {config.target_swe_bench_solve_rate:.1%})")
     
     targets_met = []
     if swe_results['avg_token_reduction'] >= config.target_token_reduction:
         targets_met.append("✓ Token Reduction")
     if swe_results['avg_quality_score'] >= config.target_quality_retention:
         targets_met.append("✓ Quality Retention")
-    if swe_results['solve_rate'] >= config.target_swe_bench_solve_rate:
+    if solve_rate is not None and solve_rate >= config.target_swe_bench_solve_rate:
         targets_met.append("✓ SWE-Bench Solve Rate")
     
     print(f"\nTargets Met: {', '.join(targets_met)}")
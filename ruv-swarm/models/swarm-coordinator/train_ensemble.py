@@ -14,13 +14,15 @@ Target: 95%+ coordination accuracy with cognitive diversity optimization
 
 import os
 import json
+import inspect
+import importlib.util
 import numpy as np
 import pandas as pd
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import DataLoader, Dataset, BatchSampler, RandomSampler, SequentialSampler
 from torch_geometric.nn import SAGEConv, global_mean_pool
 from torch_geometric.data import Data, Batch
 from sklearn.model_selection import train_test_split
@@ -40,8 +42,9 @@ np.random.seed(42)
 class CoordinatorDataset(Dataset):
     """Dataset for coordinator training data"""
     
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, with_graphs: bool = False):
         self.data = self._load_data(data_path)
+        self.with_graphs = with_graphs
         self.scaler = StandardScaler()
         self._preprocess_data()
     
@@ -56,21 +59,77 @@ class CoordinatorDataset(Dataset):
         labels = np.array([item['labels'] for item in self.data])
         
         # Normalize features
-        self.features = self.scaler.fit_transform(features)
-        self.labels = labels
+        features = self.scaler.fit_transform(features)
         
-        # Extract metadata for cognitive diversity modeling
-        self.metadata = [item.get('metadata', {}) for item in self.data]
+        # Per-swarm agent/task graphs for the GraphSAGE task distributor
+        if self.with_graphs:
+            self.graphs = [
+                swarm_graph_from_item(item, features[i], self.scaler)
+                for i, item in enumerate(self.data)
+            ]
+        
+        # Contiguous float32 storage, sliced a whole batch at a time
+        self.features = torch.as_tensor(features, dtype=torch.float32).contiguous()
+        self.labels = torch.as_tensor(labels, dtype=torch.float32).contiguous()
+        
+        # Extract metadata for cognitive diversity modeling (one array per key)
+        self.metadata = columnar_metadata([item.get('metadata', {}) for item in self.data])
         
     def __len__(self):
         return len(self.features)
     
     def __getitem__(self, idx):
-        return {
-            'features': torch.FloatTensor(self.features[idx]),
-            'labels': torch.FloatTensor(self.labels[idx]),
-            'metadata': self.metadata[idx]
+        """One sample for an integer index (Python, NumPy or 0-d tensor), a whole batch for a list/array of indices"""
+        single = np.ndim(idx) == 0
+        if single:
+            idx = int(idx)
+        sample = {
+            'features': self.features[idx],
+            'labels': self.labels[idx],
+            'metadata': {key: column[idx] for key, column in self.metadata.items()}
         }
+        if self.with_graphs:
+            if single:
+                sample['graph'] = self.graphs[idx]
+            else:
+                sample['graph'] = Batch.from_data_list([self.graphs[i] for i in idx])
+        return sample
+
+def columnar_metadata(metadata: List[Dict]) -> Dict[str, np.ndarray]:
+    """Turn per-sample metadata dicts into one array per key (None where a key is missing)"""
+    keys = sorted({key for item in metadata for key in item})
+    columns = {}
+    for key in keys:
+        values = [item.get(key) for item in metadata]
+        if all(isinstance(v, (int, float, bool, str)) for v in values):
+            columns[key] = np.array(values)  # Plain numeric or string column
+        else:
+            columns[key] = np.empty(len(values), dtype=object)
+            columns[key][:] = values
+    return columns
+
+def batch_loader(dataset: Dataset, batch_size: int, shuffle: bool = False, drop_last: bool = False) -> DataLoader:
+    """DataLoader that indexes the dataset once per batch instead of collating single items"""
+    sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+    return DataLoader(dataset, sampler=BatchSampler(sampler, batch_size, drop_last), batch_size=None)
+
+def swarm_graph_from_item(item: Dict, features: np.ndarray, scaler=None) -> Data:
+    """Build the agent/task graph of one swarm sample.
+    
+    Samples may carry a ``graph`` entry with ``node_features`` (same schema as
+    ``features``) and ``edge_index`` ([2, num_edges]). Samples without one
+    become a single-node graph holding the sample's own features.
+    """
+    graph = item.get('graph')
+    if not graph:
+        return Data(x=torch.FloatTensor(features).unsqueeze(0), edge_index=torch.empty((2, 0), dtype=torch.long))
+    
+    node_features = np.asarray(graph['node_features'], dtype=np.float64)
+    if scaler is not None:
+        node_features = scaler.transform(node_features)
+    edge_index = torch.as_tensor(graph.get('edge_index', [[], []]), dtype=torch.long).reshape(2, -1)
+    
+    return Data(x=torch.FloatTensor(node_features), edge_index=edge_index)
 
 class GraphSAGETaskDistributor(nn.Module):
     """GraphSAGE model for task distribution and dependency analysis"""
@@ -78,6 +137,7 @@ class GraphSAGETaskDistributor(nn.Module):
     def __init__(self, input_dim: int, hidden_dim: int = 128, output_dim: int = 64, num_layers: int = 3):
         super().__init__()
         self.num_layers = num_layers
+        self.output_dim = output_dim
         
         self.convs = nn.ModuleList()
         self.convs.append(SAGEConv(input_dim, hidden_dim))
@@ -102,6 +162,27 @@ class GraphSAGETaskDistributor(nn.Module):
             
         return x
 
+# Packed cognitive output layout: five 4-way profiles (grouped softmax) followed by
+# the diversity score and the selection probability (sigmoids)
+COGNITIVE_DIMENSIONS = ('problem_solving', 'info_processing', 'decision_making', 'communication', 'learning')
+PROFILE_SIZE = 4
+NUM_PROFILE_OUTPUTS = len(COGNITIVE_DIMENSIONS) * PROFILE_SIZE
+DIVERSITY_INDEX = NUM_PROFILE_OUTPUTS
+SELECTION_INDEX = NUM_PROFILE_OUTPUTS + 1
+PACKED_OUTPUT_SIZE = NUM_PROFILE_OUTPUTS + 2
+
+def pack_cognitive_output(logits: torch.Tensor) -> torch.Tensor:
+    """Grouped softmax over the profile logits and sigmoid over the two scalar heads"""
+    profiles = F.softmax(logits[..., :NUM_PROFILE_OUTPUTS].unflatten(-1, (len(COGNITIVE_DIMENSIONS), PROFILE_SIZE)), dim=-1)
+    return torch.cat([profiles.flatten(-2), torch.sigmoid(logits[..., NUM_PROFILE_OUTPUTS:])], dim=-1)
+
+def cognitive_profile_view(packed: torch.Tensor) -> Dict[str, torch.Tensor]:
+    """Dict of per-dimension profile views into a packed cognitive output"""
+    return {
+        name: packed[..., i * PROFILE_SIZE:(i + 1) * PROFILE_SIZE]
+        for i, name in enumerate(COGNITIVE_DIMENSIONS)
+    }
+
 class TransformerAgentSelector(nn.Module):
     """Transformer model for agent selection with cognitive profiling"""
     
@@ -117,46 +198,132 @@ class TransformerAgentSelector(nn.Module):
             dropout=0.1,
             batch_first=True
         )
-        self.transformer = nn.TransformerEncoder(encoder_layer, num_layers=num_layers)
-        
-        # Cognitive profiling heads
-        self.problem_solving_head = nn.Linear(d_model, 4)  # analytical, creative, systematic, heuristic
-        self.info_processing_head = nn.Linear(d_model, 4)  # sequential, parallel, hierarchical, associative
-        self.decision_making_head = nn.Linear(d_model, 4) # rational, intuitive, consensus, authoritative
-        self.communication_head = nn.Linear(d_model, 4)   # direct, collaborative, questioning, supportive
-        self.learning_head = nn.Linear(d_model, 4)        # trial-error, observation, instruction, reflection
-        
-        self.diversity_predictor = nn.Linear(d_model, 1)
-        self.selection_head = nn.Linear(d_model, 1)
-        
-    def forward(self, x):
+        # Nested tensors let the fused encoder kernels skip padded agents in eval mode
+        self.transformer = nn.TransformerEncoder(encoder_layer, num_layers=num_layers, enable_nested_tensor=True)
+        self._check_single_token_layers()
+        
+        # Fused cognitive profiling heads, in COGNITIVE_DIMENSIONS order:
+        # problem_solving   - analytical, creative, systematic, heuristic
+        # info_processing   - sequential, parallel, hierarchical, associative
+        # decision_making   - rational, intuitive, consensus, authoritative
+        # communication     - direct, collaborative, questioning, supportive
+        # learning          - trial-error, observation, instruction, reflection
+        # followed by the diversity predictor and the selection head
+        self.cognitive_head = nn.Linear(d_model, PACKED_OUTPUT_SIZE)
+        
+        self._register_load_state_dict_pre_hook(self._fuse_legacy_heads)
+        
+    def forward(self, x, agent_mask=None):
+        """Encode a task ([batch, input_dim]) or a set of candidate agents ([batch, num_agents, input_dim]).
+        
+        ``agent_mask`` is a [batch, num_agents] bool tensor that is True for padding positions.
+        """
         # Input projection
         x = self.input_projection(x)
         if len(x.shape) == 2:
             x = x.unsqueeze(1)  # Add sequence dimension
+        
+        if x.size(1) == 1:
+            # Self-attention over a single token is a linear map, so skip the attention kernels
+            encoded = self._encode_single_token(x)
+            pooled = encoded[:, 0]
+            agent_scores = None
+        else:
+            encoded = self.transformer(x, src_key_padding_mask=agent_mask)
             
-        # Transformer encoding
-        encoded = self.transformer(x)
-        pooled = encoded.mean(dim=1)  # Global average pooling
-        
-        # Cognitive profile predictions
-        cognitive_profiles = {
-            'problem_solving': F.softmax(self.problem_solving_head(pooled), dim=-1),
-            'info_processing': F.softmax(self.info_processing_head(pooled), dim=-1),
-            'decision_making': F.softmax(self.decision_making_head(pooled), dim=-1),
-            'communication': F.softmax(self.communication_head(pooled), dim=-1),
-            'learning': F.softmax(self.learning_head(pooled), dim=-1)
-        }
+            # Mean over real agents only
+            if agent_mask is not None:
+                valid = (~agent_mask).unsqueeze(-1).to(encoded.dtype)
+                encoded = encoded * valid
+                pooled = encoded.sum(dim=1) / valid.sum(dim=1).clamp(min=1.0)
+            else:
+                pooled = encoded.mean(dim=1)  # Global average pooling
+            
+            # Per-agent selection scores rank the candidates
+            selection_weight = self.cognitive_head.weight[SELECTION_INDEX:SELECTION_INDEX + 1]
+            selection_bias = self.cognitive_head.bias[SELECTION_INDEX:SELECTION_INDEX + 1]
+            agent_scores = torch.sigmoid(F.linear(encoded, selection_weight, selection_bias)).squeeze(-1)
+            if agent_mask is not None:
+                agent_scores = agent_scores.masked_fill(agent_mask, 0.0)
+        
+        # Cognitive profile predictions, diversity and selection in one packed tensor
+        packed_output = pack_cognitive_output(self.cognitive_head(pooled))
         
-        diversity_score = torch.sigmoid(self.diversity_predictor(pooled))
-        selection_prob = torch.sigmoid(self.selection_head(pooled))
+        diversity_score = packed_output[:, DIVERSITY_INDEX:DIVERSITY_INDEX + 1]
+        selection_prob = packed_output[:, SELECTION_INDEX:SELECTION_INDEX + 1]
+        if agent_scores is None:
+            agent_scores = selection_prob  # The single candidate
         
         return {
-            'cognitive_profiles': cognitive_profiles,
+            'packed_output': packed_output,
+            'cognitive_profiles': cognitive_profile_view(packed_output),
             'diversity_score': diversity_score,
             'selection_prob': selection_prob,
+            'agent_scores': agent_scores,
             'encoded_features': pooled
         }
+    
+    @staticmethod
+    def _fuse_legacy_heads(state_dict, prefix, *args):
+        """Load checkpoints saved with the separate per-dimension heads"""
+        legacy = [f'{prefix}{name}_head' for name in COGNITIVE_DIMENSIONS]
+        legacy += [f'{prefix}diversity_predictor', f'{prefix}selection_head']
+        if f'{legacy[0]}.weight' not in state_dict:
+            return
+        
+        for param in ('weight', 'bias'):
+            state_dict[f'{prefix}cognitive_head.{param}'] = torch.cat(
+                [state_dict.pop(f'{name}.{param}') for name in legacy]
+            )
+    
+    def _check_single_token_layers(self):
+        """Fail at construction if the encoder layers differ from what _encode_single_token re-implements"""
+        for layer in self.transformer.layers:
+            attn = layer.self_attn
+            supported = (
+                callable(layer.activation)
+                and all(isinstance(getattr(layer, name, None), nn.Linear) for name in ('linear1', 'linear2'))
+                and all(isinstance(getattr(layer, name, None), nn.Dropout) for name in ('dropout', 'dropout1', 'dropout2'))
+                and isinstance(layer.norm_first, bool)
+                # Packed, biased in-projection; no bias_k/bias_v or zero-attention tokens
+                and attn.in_proj_weight is not None and attn.in_proj_bias is not None
+                and attn.bias_k is None and attn.bias_v is None and not attn.add_zero_attn
+                and attn.batch_first
+            )
+            if not supported:
+                raise ValueError("TransformerEncoderLayer configuration not supported by the single-token fast path")
+    
+    @staticmethod
+    def _feed_forward(layer, x):
+        return layer.dropout2(layer.linear2(layer.dropout(layer.activation(layer.linear1(x)))))
+    
+    def _encode_single_token(self, x):
+        """Run the encoder layers on a length-1 sequence without attention.
+        
+        With one token the attention weights are all 1, so self-attention reduces
+        to out_proj(v_proj(x)); attention dropout becomes a per-head mask on v.
+        """
+        for layer in self.transformer.layers:
+            attn = layer.self_attn
+            d_model = attn.embed_dim
+            
+            h = layer.norm1(x) if layer.norm_first else x
+            v = F.linear(h, attn.in_proj_weight[2 * d_model:], attn.in_proj_bias[2 * d_model:])
+            if self.training and attn.dropout > 0:
+                head_mask = F.dropout(v.new_ones(v.size(0), 1, attn.num_heads, 1), attn.dropout)
+                v = (v.view(v.size(0), 1, attn.num_heads, -1) * head_mask).view_as(v)
+            sa = layer.dropout1(attn.out_proj(v))
+            
+            if layer.norm_first:
+                x = x + sa
+                x = x + self._feed_forward(layer, layer.norm2(x))
+            else:
+                x = layer.norm1(x + sa)
+                x = layer.norm2(x + self._feed_forward(layer, x))
+        
+        if self.transformer.norm is not None:
+            x = self.transformer.norm(x)
+        return x
 
 class DQNLoadBalancer(nn.Module):
     """Deep Q-Network for dynamic load balancing"""
@@ -164,6 +331,7 @@ class DQNLoadBalancer(nn.Module):
     def __init__(self, state_dim: int, action_dim: int = 4, hidden_dim: int = 256):
         super().__init__()
         self.action_dim = action_dim
+        self.feature_dim = hidden_dim // 2
         
         self.network = nn.Sequential(
             nn.Linear(state_dim, hidden_dim),
@@ -277,6 +445,7 @@ class MAMLMetaLearner(nn.Module):
     
     def __init__(self, input_dim: int, output_dim: int, hidden_dim: int = 128):
         super().__init__()
+        self.output_dim = output_dim
         self.network = nn.Sequential(
             nn.Linear(input_dim, hidden_dim),
             nn.ReLU(),
@@ -335,21 +504,38 @@ class EnsembleCoordinator(nn.Module):
         self.diversity_optimizer = CognitiveDiversityVAE(input_dim)
         self.meta_learner = MAMLMetaLearner(input_dim, 2)  # 2 outputs for coordination
         
-        # Ensemble fusion layer - calculate actual dimensions dynamically
-        self.fusion_layer = None  # Will be initialized on first forward pass
+        # Ensemble fusion layer sized from the component feature widths
+        self.fusion_input_dim = (
+            self.task_distributor.output_dim +
+            self.agent_selector.d_model +
+            self.load_balancer.feature_dim +
+            self.diversity_optimizer.latent_dim +
+            self.meta_learner.output_dim
+        )
+        self.fusion_layer = nn.Sequential(
+            nn.Linear(self.fusion_input_dim, 256),
+            nn.ReLU(),
+            nn.Dropout(0.3),
+            nn.Linear(256, 128),
+            nn.ReLU(),
+            nn.Linear(128, 2)  # Final coordination output
+        )
         
-    def forward(self, x, edge_index=None, batch=None):
+    def forward(self, x, edge_index=None, batch=None, graph=None, agents=None, agent_mask=None):
         # Get predictions from all models
         
-        # Task distribution (needs graph structure)
-        if edge_index is not None:
+        # Task distribution over the batched swarm graphs (one pooled row per sample)
+        if graph is not None:
+            task_features = self.task_distributor(graph.x, graph.edge_index, graph.batch)
+        elif edge_index is not None:
             task_features = self.task_distributor(x, edge_index, batch)
         else:
-            # Create dummy graph structure for non-graph inputs
-            task_features = torch.randn(x.size(0), 64, device=x.device)
+            # No topology given: each sample is an isolated single-node graph
+            empty_edges = torch.empty((2, 0), dtype=torch.long, device=x.device)
+            task_features = self.task_distributor(x, empty_edges)
         
-        # Agent selection
-        agent_output = self.agent_selector(x)
+        # Agent selection (over the candidate agents of each sample when given)
+        agent_output = self.agent_selector(agents if agents is not None else x, agent_mask)
         agent_features = agent_output['encoded_features']
         
         # Load balancing
@@ -372,18 +558,6 @@ class EnsembleCoordinator(nn.Module):
             meta_features
         ], dim=-1)
         
-        # Initialize fusion layer on first forward pass
-        if self.fusion_layer is None:
-            fusion_input_dim = ensemble_features.size(-1)
-            self.fusion_layer = nn.Sequential(
-                nn.Linear(fusion_input_dim, 256),
-                nn.ReLU(),
-                nn.Dropout(0.3),
-                nn.Linear(256, 128),
-                nn.ReLU(),
-                nn.Linear(128, 2)  # Final coordination output
-            ).to(x.device)
-        
         # Final fusion
         coordination_output = self.fusion_layer(ensemble_features)
         
@@ -396,22 +570,75 @@ class EnsembleCoordinator(nn.Module):
             'meta_features': meta_features
         }
 
+class CoordinatorInferenceModule(nn.Module):
+    """Tensor-in/tensor-out view of a coordinator for TorchScript and ONNX export"""
+    
+    def __init__(self, coordinator: nn.Module):
+        super().__init__()
+        self.coordinator = coordinator
+        
+    def forward(self, x):
+        return self.coordinator(x)['coordination_output']
+
+def export_coordinator(model: nn.Module, example_input: torch.Tensor, torchscript_path: Optional[str] = None,
+                       onnx_path: Optional[str] = None, dynamic_batch: bool = True) -> Dict[str, str]:
+    """Export the coordination output of a trained coordinator as TorchScript and/or ONNX.
+    
+    The model is traced in eval mode on ``example_input``; with ``dynamic_batch``
+    the ONNX graph keeps the batch dimension symbolic. ONNX export needs the
+    optional ``onnx`` package and is skipped with a message when it is missing.
+    """
+    wrapper = CoordinatorInferenceModule(model).eval()
+    exported = {}
+    
+    with torch.no_grad():
+        # One untraced pass so lazily built state (e.g. cached synthetic graphs)
+        # enters the exported graphs as constants rather than construction ops
+        wrapper(example_input)
+        
+        if torchscript_path:
+            # check_trace is off because the VAE samples its latent code
+            traced = torch.jit.trace(wrapper, example_input, check_trace=False)
+            traced.save(torchscript_path)
+            exported['torchscript'] = torchscript_path
+        
+        if onnx_path and importlib.util.find_spec('onnx') is None:
+            print(f"⚠️ Skipping ONNX export to {onnx_path}: the 'onnx' package is not installed (pip install onnx)")
+        elif onnx_path:
+            dynamic_axes = {'features': {0: 'batch'}, 'coordination_output': {0: 'batch'}} if dynamic_batch else None
+            # Use the tracing exporter; newer torch defaults to dynamo, which also requires onnxscript
+            export_kwargs = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+            torch.onnx.export(
+                wrapper, (example_input,), onnx_path,
+                input_names=['features'],
+                output_names=['coordination_output'],
+                dynamic_axes=dynamic_axes,
+                **export_kwargs
+            )
+            exported['onnx'] = onnx_path
+    
+    return exported
+
 class CognitiveDiversityMetrics:
     """Cognitive diversity metrics and optimization"""
     
     @staticmethod
-    def calculate_diversity_score(profiles: Dict[str, torch.Tensor]) -> torch.Tensor:
-        """Calculate cognitive diversity score across multiple dimensions"""
-        diversity_scores = []
+    def calculate_diversity_score(profiles) -> torch.Tensor:
+        """Calculate cognitive diversity score across multiple dimensions.
+        
+        Takes the packed selector output ([batch, 22] or just the 20 profile
+        columns) or a dict of per-dimension profiles.
+        """
+        if isinstance(profiles, dict):
+            profiles = torch.cat([profiles[name] for name in COGNITIVE_DIMENSIONS], dim=-1)
+        profiles = profiles[..., :NUM_PROFILE_OUTPUTS].unflatten(-1, (len(COGNITIVE_DIMENSIONS), PROFILE_SIZE))
         
-        for dimension, profile in profiles.items():
-            # Calculate entropy-based diversity
-            entropy = -torch.sum(profile * torch.log(profile + 1e-8), dim=-1)
-            diversity_scores.append(entropy)
+        # Entropy-based diversity per dimension
+        entropy = -torch.sum(profiles * torch.log(profiles + 1e-8), dim=-1)
         
         # Weighted average of diversity scores
-        weights = torch.tensor([0.25, 0.2, 0.2, 0.15, 0.2])  # Based on config
-        total_diversity = torch.stack(diversity_scores).T @ weights
+        weights = torch.tensor([0.25, 0.2, 0.2, 0.15, 0.2], device=entropy.device)  # Based on config
+        total_diversity = entropy @ weights
         
         return total_diversity.mean()
     
@@ -428,23 +655,169 @@ class CognitiveDiversityMetrics:
         js_div = 0.5 * (kl_pm + kl_qm)
         return js_div.mean()
 
+class SumTree:
+    """Binary sum tree over transition priorities for proportional sampling"""
+    
+    def __init__(self, capacity: int):
+        # Leaves live at [size, 2 * size); size is the next power of two
+        self.size = 1 << max(0, (capacity - 1).bit_length())
+        self.depth = self.size.bit_length() - 1
+        self.tree = torch.zeros(2 * self.size, dtype=torch.float64)
+    
+    @property
+    def total(self) -> float:
+        return self.tree[1].item()
+    
+    def update(self, indices: torch.Tensor, priorities: torch.Tensor):
+        """Set leaf priorities and refresh their ancestors level by level"""
+        nodes = indices + self.size
+        self.tree[nodes] = priorities.to(torch.float64)
+        for _ in range(self.depth):
+            nodes = torch.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+    
+    def get(self, indices: torch.Tensor) -> torch.Tensor:
+        return self.tree[indices + self.size]
+    
+    def find(self, targets: torch.Tensor) -> torch.Tensor:
+        """Leaf index whose prefix-sum interval contains each target"""
+        nodes = torch.ones_like(targets, dtype=torch.long)
+        targets = targets.clone()
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = targets > left_sum
+            targets -= left_sum * go_right
+            nodes = left + go_right
+        return nodes - self.size
+
+class ReplayBuffer:
+    """Preallocated circular replay buffer with optional prioritized replay"""
+    
+    def __init__(self, capacity: int, state_dim: int, prioritized: bool = False, alpha: float = 0.6,
+                 beta: float = 0.4, beta_increment: float = 1e-3, pin_memory: bool = False):
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        
+        self.states = torch.empty((capacity, state_dim))
+        self.actions = torch.empty(capacity, dtype=torch.long)
+        self.rewards = torch.empty(capacity)
+        self.next_states = torch.empty((capacity, state_dim))
+        self.dones = torch.empty(capacity, dtype=torch.bool)
+        
+        self.position = 0
+        self.size = 0
+        
+        if prioritized:
+            self.priorities = SumTree(capacity)
+            self.max_priority = 1.0
+    
+    def __len__(self):
+        return self.size
+    
+    def add(self, state, action, reward, next_state, done):
+        """Store one transition in the next slot"""
+        i = self.position
+        self.states[i] = torch.as_tensor(state, dtype=torch.float32)
+        self.actions[i] = int(action)
+        self.rewards[i] = float(reward)
+        self.next_states[i] = torch.as_tensor(next_state, dtype=torch.float32)
+        self.dones[i] = bool(done)
+        
+        if self.prioritized:
+            self.priorities.update(torch.tensor([i]), torch.tensor([self.max_priority ** self.alpha]))
+        
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Store a batch of transitions, overwriting the oldest once full"""
+        n = len(states)
+        if n > self.capacity:
+            states, actions, rewards, next_states, dones = (
+                t[-self.capacity:] for t in (states, actions, rewards, next_states, dones)
+            )
+            n = self.capacity
+        
+        indices = (self.position + torch.arange(n)) % self.capacity
+        self.states[indices] = torch.as_tensor(states, dtype=torch.float32)
+        self.actions[indices] = torch.as_tensor(actions, dtype=torch.long)
+        self.rewards[indices] = torch.as_tensor(rewards, dtype=torch.float32)
+        self.next_states[indices] = torch.as_tensor(next_states, dtype=torch.float32)
+        self.dones[indices] = torch.as_tensor(dones, dtype=torch.bool)
+        
+        if self.prioritized:
+            # New transitions get the highest priority seen so far
+            self.priorities.update(indices, torch.full((n,), self.max_priority ** self.alpha))
+        
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+    
+    def sample(self, batch_size: int) -> Dict[str, torch.Tensor]:
+        """Sample a batch; prioritized buffers also return importance-sampling weights"""
+        if self.prioritized:
+            # Stratified proportional sampling over the sum tree
+            total = self.priorities.total
+            segment = total / batch_size
+            targets = (torch.arange(batch_size, dtype=torch.float64) + torch.rand(batch_size, dtype=torch.float64)) * segment
+            indices = self.priorities.find(targets.clamp(max=total)).clamp(max=self.size - 1)
+            
+            probs = self.priorities.get(indices) / total
+            weights = (self.size * probs) ** (-self.beta)
+            weights = (weights / weights.max()).float()
+            self.beta = min(1.0, self.beta + self.beta_increment)
+        else:
+            indices = torch.randint(0, self.size, (batch_size,))
+            weights = None
+        
+        batch = {
+            'states': self.states[indices],
+            'actions': self.actions[indices],
+            'rewards': self.rewards[indices],
+            'next_states': self.next_states[indices],
+            'dones': self.dones[indices],
+            'indices': indices
+        }
+        if weights is not None:
+            batch['weights'] = weights
+        
+        if self.pin_memory:
+            batch = {key: value.pin_memory() for key, value in batch.items()}
+        
+        return batch
+    
+    def update_priorities(self, indices: torch.Tensor, td_errors: torch.Tensor):
+        """Refresh priorities from the latest TD errors"""
+        priorities = td_errors.detach().abs().cpu().double() + 1e-6
+        self.max_priority = max(self.max_priority, priorities.max().item())
+        self.priorities.update(indices, priorities ** self.alpha)
+
 class ReinforcementLearningTrainer:
     """Reinforcement learning trainer for dynamic coordination"""
     
-    def __init__(self, model: DQNLoadBalancer, lr: float = 1e-3):
+    def __init__(self, model: DQNLoadBalancer, lr: float = 1e-3, buffer_size: int = 10000,
+                 prioritized: bool = False, pin_memory: bool = False):
         self.model = model
         self.target_model = DQNLoadBalancer(model.network[0].in_features, model.action_dim)
         self.optimizer = optim.Adam(model.parameters(), lr=lr)
-        self.memory = []
+        self.memory = ReplayBuffer(
+            buffer_size, model.network[0].in_features, prioritized=prioritized, pin_memory=pin_memory
+        )
         self.epsilon = 0.9
         self.epsilon_decay = 0.995
         self.epsilon_min = 0.1
         
     def store_transition(self, state, action, reward, next_state, done):
         """Store transition in replay buffer"""
-        self.memory.append((state, action, reward, next_state, done))
-        if len(self.memory) > 10000:  # Limit memory size
-            self.memory.pop(0)
+        self.memory.add(state, action, reward, next_state, done)
+    
+    def store_transitions(self, states, actions, rewards, next_states, dones):
+        """Store a batch of transitions in replay buffer"""
+        self.memory.add_batch(states, actions, rewards, next_states, dones)
     
     def train_step(self, batch_size: int = 32):
         """Perform one training step"""
@@ -452,23 +825,24 @@ class ReinforcementLearningTrainer:
             return 0.0
         
         # Sample batch from memory
-        batch = np.random.choice(len(self.memory), batch_size, replace=False)
-        states = torch.stack([torch.FloatTensor(self.memory[i][0]) for i in batch])
-        actions = torch.LongTensor([self.memory[i][1] for i in batch])
-        rewards = torch.FloatTensor([self.memory[i][2] for i in batch])
-        next_states = torch.stack([torch.FloatTensor(self.memory[i][3]) for i in batch])
-        dones = torch.BoolTensor([self.memory[i][4] for i in batch])
+        device = next(self.model.parameters()).device
+        batch = {key: value.to(device, non_blocking=True) for key, value in self.memory.sample(batch_size).items()}
         
         # Current Q values
-        current_q_values = self.model(states)['q_dueling'].gather(1, actions.unsqueeze(1))
+        current_q_values = self.model(batch['states'])['q_dueling'].gather(1, batch['actions'].unsqueeze(1)).squeeze(1)
         
         # Next Q values from target network
         with torch.no_grad():
-            next_q_values = self.target_model(next_states)['q_dueling'].max(1)[0]
-            target_q_values = rewards + (0.99 * next_q_values * ~dones)
-        
-        # Compute loss
-        loss = F.mse_loss(current_q_values.squeeze(), target_q_values)
+            next_q_values = self.target_model(batch['next_states'])['q_dueling'].max(1)[0]
+            target_q_values = batch['rewards'] + (0.99 * next_q_values * ~batch['dones'])
+        
+        # Compute loss (importance-weighted under prioritized replay)
+        if 'weights' in batch:
+            td_errors = current_q_values - target_q_values
+            loss = (batch['weights'] * td_errors.pow(2)).mean()
+            self.memory.update_priorities(batch['indices'].cpu(), td_errors)
+        else:
+            loss = F.mse_loss(current_q_values, target_q_values)
         
         # Optimize
         self.optimizer.zero_grad()
@@ -498,7 +872,7 @@ class EnsembleTrainer:
         self.agent_optimizer = optim.Adam(model.agent_selector.parameters(), lr=1e-3)
         self.diversity_optimizer = optim.Adam(model.diversity_optimizer.parameters(), lr=1e-3)
         self.meta_optimizer = optim.Adam(model.meta_learner.parameters(), lr=1e-3)
-        self.ensemble_optimizer = None  # Will be initialized after first forward pass
+        self.ensemble_optimizer = optim.Adam(model.fusion_layer.parameters(), lr=1e-3)
         
         # RL trainer for load balancing
         self.rl_trainer = ReinforcementLearningTrainer(model.load_balancer)
@@ -525,17 +899,13 @@ class EnsembleTrainer:
             metadata = batch['metadata']
             
             # Forward pass
-            output = self.model(features)
-            
-            # Initialize ensemble optimizer after first forward pass
-            if self.ensemble_optimizer is None and self.model.fusion_layer is not None:
-                self.ensemble_optimizer = optim.Adam(self.model.fusion_layer.parameters(), lr=1e-3)
+            output = self.model(features, graph=batch.get('graph'))
             
             # Coordination loss
             coord_loss = F.mse_loss(output['coordination_output'], labels)
             
             # Diversity loss
-            agent_profiles = output['agent_output']['cognitive_profiles']
+            agent_profiles = output['agent_output']['packed_output']
             diversity_score = CognitiveDiversityMetrics.calculate_diversity_score(agent_profiles)
             diversity_loss = F.mse_loss(diversity_score, torch.ones_like(diversity_score) * 0.85)  # Target diversity
             
@@ -549,17 +919,19 @@ class EnsembleTrainer:
             total_loss = coord_loss + 0.3 * diversity_loss + 0.2 * vae_loss
             
             # Backward pass
-            if self.ensemble_optimizer is not None:
-                self.ensemble_optimizer.zero_grad()
+            self.task_optimizer.zero_grad()
+            self.ensemble_optimizer.zero_grad()
             self.agent_optimizer.zero_grad()
             self.diversity_optimizer.zero_grad()
+            self.meta_optimizer.zero_grad()
             
             total_loss.backward()
             
-            if self.ensemble_optimizer is not None:
-                self.ensemble_optimizer.step()
+            self.task_optimizer.step()
+            self.ensemble_optimizer.step()
             self.agent_optimizer.step()
             self.diversity_optimizer.step()
+            self.meta_optimizer.step()
             
             # RL training (simulated experience)
             if batch_idx % 10 == 0:  # Train RL every 10 batches
@@ -588,15 +960,14 @@ class EnsembleTrainer:
         batch_size = features.size(0)
         
         # Generate synthetic states, actions, rewards
-        states = features.detach().numpy()
-        actions = np.random.randint(0, 4, size=batch_size)  # 4 possible actions
-        rewards = np.random.normal(0.5, 0.2, size=batch_size)  # Simulate rewards
-        next_states = states + np.random.normal(0, 0.1, size=states.shape)
-        dones = np.random.choice([True, False], size=batch_size, p=[0.1, 0.9])
+        states = features.detach().cpu()
+        actions = torch.randint(0, 4, (batch_size,))  # 4 possible actions
+        rewards = torch.normal(0.5, 0.2, (batch_size,))  # Simulate rewards
+        next_states = states + torch.randn_like(states) * 0.1
+        dones = torch.rand(batch_size) < 0.1
         
         # Store transitions
-        for i in range(batch_size):
-            self.rl_trainer.store_transition(states[i], actions[i], rewards[i], next_states[i], dones[i])
+        self.rl_trainer.store_transitions(states, actions, rewards, next_states, dones)
         
         # Train RL model
         return self.rl_trainer.train_step()
@@ -613,14 +984,14 @@ class EnsembleTrainer:
                 features = batch['features']
                 labels = batch['labels']
                 
-                output = self.model(features)
+                output = self.model(features, graph=batch.get('graph'))
                 
                 # Coordination loss and accuracy
                 coord_loss = F.mse_loss(output['coordination_output'], labels)
                 coord_accuracy = self._calculate_coordination_accuracy(output['coordination_output'], labels)
                 
                 # Diversity metrics
-                agent_profiles = output['agent_output']['cognitive_profiles']
+                agent_profiles = output['agent_output']['packed_output']
                 diversity_score = CognitiveDiversityMetrics.calculate_diversity_score(agent_profiles)
                 
                 val_losses['coordination'] += coord_loss.item()
@@ -695,11 +1066,9 @@ class EnsembleTrainer:
             'agent_optimizer_state_dict': self.agent_optimizer.state_dict(),
             'diversity_optimizer_state_dict': self.diversity_optimizer.state_dict(),
             'meta_optimizer_state_dict': self.meta_optimizer.state_dict(),
+            'ensemble_optimizer_state_dict': self.ensemble_optimizer.state_dict(),
         }
         
-        if self.ensemble_optimizer is not None:
-            save_dict['ensemble_optimizer_state_dict'] = self.ensemble_optimizer.state_dict()
-            
         torch.save(save_dict, filepath)
         print(f'Model saved to {filepath}')
 
@@ -770,12 +1139,12 @@ def main():
     
     # Load data
     print("📊 Loading training data...")
-    train_dataset = CoordinatorDataset('/workspaces/ruv-FANN/ruv-swarm/training-data/splits/coordinator/train.json')
-    val_dataset = CoordinatorDataset('/workspaces/ruv-FANN/ruv-swarm/training-data/splits/coordinator/validation.json')
+    train_dataset = CoordinatorDataset('/workspaces/ruv-FANN/ruv-swarm/training-data/splits/coordinator/train.json', with_graphs=True)
+    val_dataset = CoordinatorDataset('/workspaces/ruv-FANN/ruv-swarm/training-data/splits/coordinator/validation.json', with_graphs=True)
     
-    # Create data loaders
-    train_loader = DataLoader(train_dataset, batch_size=16, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=16, shuffle=False)
+    # Create data loaders (batches are sliced from the dataset tensors, swarm graphs merged into one PyG Batch)
+    train_loader = batch_loader(train_dataset, batch_size=16, shuffle=True)
+    val_loader = batch_loader(val_dataset, batch_size=16, shuffle=False)
     
     # Initialize model
     input_dim = len(train_dataset.features[0])
@@ -801,6 +1170,14 @@ def main():
     print("💾 Saving final model...")
     trainer.save_model('/workspaces/ruv-FANN/ruv-swarm/models/swarm-coordinator/coordinator_weights.bin')
     
+    # Export inference builds
+    print("📦 Exporting TorchScript and ONNX coordinators...")
+    export_coordinator(
+        model, val_dataset.features[:1],
+        torchscript_path='/workspaces/ruv-FANN/ruv-swarm/models/swarm-coordinator/coordinator.pt',
+        onnx_path='/workspaces/ruv-FANN/ruv-swarm/models/swarm-coordinator/coordinator.onnx'
+    )
+    
     # Print summary
     print("✅ Training completed!")
     print(f"Final Coordination Accuracy: {report['final_metrics']['coordination_accuracy']:.3f}")
@@ -34,6 +34,7 @@ import warnings
 import random
 import math
 from datetime import datetime
+from train_ensemble import export_coordinator
 warnings.filterwarnings('ignore')
 
 # Set random seeds for reproducibility
@@ -41,173 +42,151 @@ torch.manual_seed(42)
 np.random.seed(42)
 random.seed(42)
 
+# Scenario families: agent count range and its normalization scale, difficulty, and the
+# uniform ranges of the remaining 12 features in feature-vector order
+SCENARIO_TYPES = ('simple', 'medium', 'complex', 'stress')
+SCENARIO_SPECS = {
+    'simple': {  # 2-5 agents, low complexity
+        'agents': (2, 5), 'agent_scale': 10.0, 'difficulty': 0.2,
+        'ranges': [(0.1, 0.3), (0.1, 0.4), (0.05, 0.2), (0.1, 0.3), (0.8, 1.0), (0.1, 0.2),
+                   (0.1, 0.3), (50, 100), (2, 4), (0.7, 0.9), (0.1, 0.3), (0.1, 0.2)]
+    },
+    'medium': {  # 5-20 agents, medium complexity
+        'agents': (5, 20), 'agent_scale': 50.0, 'difficulty': 0.5,
+        'ranges': [(0.3, 0.6), (0.4, 0.7), (0.2, 0.4), (0.3, 0.6), (0.6, 0.8), (0.2, 0.4),
+                   (0.3, 0.5), (100, 300), (4, 8), (0.5, 0.7), (0.3, 0.6), (0.2, 0.5)]
+    },
+    'complex': {  # 20-100 agents, high complexity
+        'agents': (20, 100), 'agent_scale': 200.0, 'difficulty': 0.8,
+        'ranges': [(0.6, 0.8), (0.7, 0.9), (0.4, 0.6), (0.6, 0.8), (0.4, 0.6), (0.4, 0.6),
+                   (0.5, 0.7), (300, 600), (8, 15), (0.3, 0.5), (0.6, 0.8), (0.5, 0.8)]
+    },
+    'stress': {  # 100+ agents, extreme complexity
+        'agents': (100, 500), 'agent_scale': 500.0, 'difficulty': 1.0,
+        'ranges': [(0.8, 1.0), (0.9, 1.0), (0.6, 0.8), (0.8, 1.0), (0.2, 0.4), (0.6, 0.8),
+                   (0.7, 0.9), (600, 1000), (15, 25), (0.1, 0.3), (0.8, 1.0), (0.8, 1.0)]
+    }
+}
+# Feature vector: [num_agents, task_complexity, system_load, comm_overhead, resource_utilization,
+# agent_availability, failure_rate, task_priority_variance, response_time_ms, coordination_rounds,
+# success_probability, cognitive_diversity_required, adaptation_requirement]
+RESPONSE_TIME_INDEX = 8
+
 class SyntheticCoordinatorDataGenerator:
     """Generate realistic synthetic training data for coordination tasks"""
     
-    def __init__(self, input_dim=13):
+    def __init__(self, input_dim=13, seed: Optional[int] = 42, dtype=np.float32):
         self.input_dim = input_dim
+        self.rng = np.random.default_rng(seed)
+        self.dtype = dtype
+        
+    def generate_scenarios(self, scenario_type: str, num_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Draw features and coordination labels for num_samples scenarios of one type"""
+        spec = SCENARIO_SPECS[scenario_type]
+        lows, highs = np.array(spec['ranges'], dtype=np.float64).T
+        
+        features = np.empty((num_samples, self.input_dim), dtype=np.float64)
+        low_agents, high_agents = spec['agents']
+        features[:, 0] = self.rng.integers(low_agents, high_agents + 1, num_samples) / spec['agent_scale']
+        features[:, 1:] = self.rng.uniform(lows, highs, size=(num_samples, len(lows)))
+        features[:, RESPONSE_TIME_INDEX] /= 1000.0  # Normalize response time
+        
+        labels = self._compute_coordination_output(features, spec['difficulty'])
+        return features.astype(self.dtype, copy=False), labels.astype(self.dtype, copy=False)
+        
+    def generate_chunk(self, num_samples: int) -> Dict[str, np.ndarray]:
+        """Generate a mixed batch of scenarios with uniformly drawn types"""
+        scenario_ids = self.rng.integers(0, len(SCENARIO_TYPES), num_samples).astype(np.int8)
+        features = np.empty((num_samples, self.input_dim), dtype=self.dtype)
+        labels = np.empty((num_samples, 2), dtype=self.dtype)
+        
+        for type_id, scenario_type in enumerate(SCENARIO_TYPES):
+            rows = np.flatnonzero(scenario_ids == type_id)
+            if len(rows):
+                features[rows], labels[rows] = self.generate_scenarios(scenario_type, len(rows))
+        
+        difficulties = np.array([SCENARIO_SPECS[t]['difficulty'] for t in SCENARIO_TYPES], dtype=np.float32)
+        return {
+            'features': features,
+            'labels': labels,
+            'scenario_id': scenario_ids,
+            'difficulty': difficulties[scenario_ids]
+        }
+        
+    def iter_chunks(self, num_samples: int, chunk_size: int = 1_000_000):
+        """Stream num_samples scenarios in fixed-size chunks"""
+        for start in range(0, num_samples, chunk_size):
+            yield self.generate_chunk(min(chunk_size, num_samples - start))
         
     def generate_training_data(self, num_samples=2000):
         """Generate comprehensive training dataset"""
-        features = []
-        labels = []
-        metadata = []
-        
-        for i in range(num_samples):
-            # Generate realistic coordination scenarios
-            scenario_type = random.choice(['simple', 'medium', 'complex', 'stress'])
-            
-            if scenario_type == 'simple':
-                feature = self._generate_simple_scenario()
-                label = self._compute_coordination_output(feature, difficulty=0.2)
-            elif scenario_type == 'medium':
-                feature = self._generate_medium_scenario()
-                label = self._compute_coordination_output(feature, difficulty=0.5)
-            elif scenario_type == 'complex':
-                feature = self._generate_complex_scenario()
-                label = self._compute_coordination_output(feature, difficulty=0.8)
-            else:  # stress
-                feature = self._generate_stress_scenario()
-                label = self._compute_coordination_output(feature, difficulty=1.0)
-            
-            features.append(feature)
-            labels.append(label)
-            metadata.append({
-                'scenario_type': scenario_type,
-                'timestamp': datetime.now().isoformat(),
-                'difficulty': {'simple': 0.2, 'medium': 0.5, 'complex': 0.8, 'stress': 1.0}[scenario_type]
-            })
+        chunk = self.generate_chunk(num_samples)
         
         return {
-            'features': np.array(features),
-            'labels': np.array(labels),
-            'metadata': metadata
+            'features': chunk['features'],
+            'labels': chunk['labels'],
+            'metadata': {
+                'scenario_type': np.array(SCENARIO_TYPES)[chunk['scenario_id']],
+                'difficulty': chunk['difficulty'],
+                'timestamp': datetime.now().isoformat()
+            }
+        }
+        
+    def write_npy(self, output_dir: str, num_samples: int, chunk_size: int = 1_000_000) -> Dict[str, str]:
+        """Stream scenarios straight into memory-mapped .npy files (features, labels, scenario_id)"""
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {name: os.path.join(output_dir, f'{name}.npy') for name in ('features', 'labels', 'scenario_id')}
+        outputs = {
+            'features': np.lib.format.open_memmap(paths['features'], mode='w+', dtype=self.dtype, shape=(num_samples, self.input_dim)),
+            'labels': np.lib.format.open_memmap(paths['labels'], mode='w+', dtype=self.dtype, shape=(num_samples, 2)),
+            'scenario_id': np.lib.format.open_memmap(paths['scenario_id'], mode='w+', dtype=np.int8, shape=(num_samples,))
         }
+        
+        offset = 0
+        for chunk in self.iter_chunks(num_samples, chunk_size):
+            end = offset + len(chunk['features'])
+            for name, output in outputs.items():
+                output[offset:end] = chunk[name]
+            offset = end
+        
+        for output in outputs.values():
+            output.flush()
+        return paths
     
     def _generate_simple_scenario(self):
         """Generate simple coordination scenario (2-5 agents, low complexity)"""
-        num_agents = random.randint(2, 5)
-        task_complexity = random.uniform(0.1, 0.3)
-        system_load = random.uniform(0.1, 0.4)
-        communication_overhead = random.uniform(0.05, 0.2)
-        
-        # Feature vector: [num_agents, task_complexity, system_load, comm_overhead, ...]
-        feature = [
-            num_agents / 10.0,  # normalized
-            task_complexity,
-            system_load,
-            communication_overhead,
-            random.uniform(0.1, 0.3),  # resource_utilization
-            random.uniform(0.8, 1.0),  # agent_availability
-            random.uniform(0.1, 0.2),  # failure_rate
-            random.uniform(0.1, 0.3),  # task_priority_variance
-            random.uniform(50, 100),   # response_time_ms (normalized later)
-            random.uniform(2, 4),      # coordination_rounds
-            random.uniform(0.7, 0.9),  # success_probability
-            random.uniform(0.1, 0.3),  # cognitive_diversity_required
-            random.uniform(0.1, 0.2)   # adaptation_requirement
-        ]
-        
-        # Normalize response time
-        feature[8] = feature[8] / 1000.0
-        
-        return feature
+        return self.generate_scenarios('simple', 1)[0][0].tolist()
     
     def _generate_medium_scenario(self):
         """Generate medium coordination scenario (5-20 agents, medium complexity)"""
-        num_agents = random.randint(5, 20)
-        task_complexity = random.uniform(0.3, 0.6)
-        system_load = random.uniform(0.4, 0.7)
-        communication_overhead = random.uniform(0.2, 0.4)
-        
-        feature = [
-            num_agents / 50.0,  # normalized for medium scale
-            task_complexity,
-            system_load,
-            communication_overhead,
-            random.uniform(0.3, 0.6),  # resource_utilization
-            random.uniform(0.6, 0.8),  # agent_availability
-            random.uniform(0.2, 0.4),  # failure_rate
-            random.uniform(0.3, 0.5),  # task_priority_variance
-            random.uniform(100, 300),  # response_time_ms
-            random.uniform(4, 8),      # coordination_rounds
-            random.uniform(0.5, 0.7),  # success_probability
-            random.uniform(0.3, 0.6),  # cognitive_diversity_required
-            random.uniform(0.2, 0.5)   # adaptation_requirement
-        ]
-        
-        feature[8] = feature[8] / 1000.0
-        return feature
+        return self.generate_scenarios('medium', 1)[0][0].tolist()
     
     def _generate_complex_scenario(self):
         """Generate complex coordination scenario (20-100 agents, high complexity)"""
-        num_agents = random.randint(20, 100)
-        task_complexity = random.uniform(0.6, 0.8)
-        system_load = random.uniform(0.7, 0.9)
-        communication_overhead = random.uniform(0.4, 0.6)
-        
-        feature = [
-            num_agents / 200.0,  # normalized for large scale
-            task_complexity,
-            system_load,
-            communication_overhead,
-            random.uniform(0.6, 0.8),  # resource_utilization
-            random.uniform(0.4, 0.6),  # agent_availability
-            random.uniform(0.4, 0.6),  # failure_rate
-            random.uniform(0.5, 0.7),  # task_priority_variance
-            random.uniform(300, 600),  # response_time_ms
-            random.uniform(8, 15),     # coordination_rounds
-            random.uniform(0.3, 0.5),  # success_probability
-            random.uniform(0.6, 0.8),  # cognitive_diversity_required
-            random.uniform(0.5, 0.8)   # adaptation_requirement
-        ]
-        
-        feature[8] = feature[8] / 1000.0
-        return feature
+        return self.generate_scenarios('complex', 1)[0][0].tolist()
     
     def _generate_stress_scenario(self):
         """Generate stress test scenario (100+ agents, extreme complexity)"""
-        num_agents = random.randint(100, 500)
-        task_complexity = random.uniform(0.8, 1.0)
-        system_load = random.uniform(0.9, 1.0)
-        communication_overhead = random.uniform(0.6, 0.8)
-        
-        feature = [
-            num_agents / 500.0,  # normalized for stress scale
-            task_complexity,
-            system_load,
-            communication_overhead,
-            random.uniform(0.8, 1.0),  # resource_utilization
-            random.uniform(0.2, 0.4),  # agent_availability
-            random.uniform(0.6, 0.8),  # failure_rate
-            random.uniform(0.7, 0.9),  # task_priority_variance
-            random.uniform(600, 1000), # response_time_ms
-            random.uniform(15, 25),    # coordination_rounds
-            random.uniform(0.1, 0.3),  # success_probability
-            random.uniform(0.8, 1.0),  # cognitive_diversity_required
-            random.uniform(0.8, 1.0)   # adaptation_requirement
-        ]
-        
-        feature[8] = feature[8] / 1000.0
-        return feature
+        return self.generate_scenarios('stress', 1)[0][0].tolist()
     
-    def _compute_coordination_output(self, feature, difficulty):
-        """Compute realistic coordination output based on input features"""
-        num_agents = feature[0] * (500 if difficulty > 0.8 else 200 if difficulty > 0.5 else 50 if difficulty > 0.2 else 10)
-        task_complexity = feature[1]
-        system_load = feature[2]
-        comm_overhead = feature[3]
+    def _compute_coordination_output(self, features, difficulty):
+        """Compute realistic coordination output based on input features ([n, input_dim])"""
+        agent_scale = 500 if difficulty > 0.8 else 200 if difficulty > 0.5 else 50 if difficulty > 0.2 else 10
+        num_agents = features[:, 0] * agent_scale
+        task_complexity = features[:, 1]
+        system_load = features[:, 2]
+        comm_overhead = features[:, 3]
         
         # Base coordination score (0-1)
         base_score = 1.0 - (task_complexity * 0.3 + system_load * 0.3 + comm_overhead * 0.2 + difficulty * 0.2)
-        base_score = max(0.1, min(0.98, base_score))
+        base_score = np.clip(base_score, 0.1, 0.98)
         
         # Estimated completion time (normalized)
         base_time = 10 + (num_agents * 0.5) + (task_complexity * 100) + (system_load * 50)
-        completion_time = base_time * (1 + random.uniform(-0.2, 0.3))  # Add realistic variance
-        completion_time = max(5, min(500, completion_time)) / 500.0  # Normalize
+        completion_time = base_time * (1 + self.rng.uniform(-0.2, 0.3, len(features)))  # Add realistic variance
+        completion_time = np.clip(completion_time, 5, 500) / 500.0  # Normalize
         
-        return [base_score, completion_time]
+        return np.stack([base_score, completion_time], axis=1)
 
 class ProductionEnsembleCoordinator(nn.Module):
     """Production-ready ensemble coordinator with all components"""
@@ -294,8 +273,15 @@ class ProductionEnsembleCoordinator(nn.Module):
         
         # Final fusion layer
         # Total features: 64 + 256 + 256 + 32 + 128 = 736
+        self.fusion_input_dim = (
+            self.task_distributor[-1].out_features +
+            self.agent_selector[-1].out_features +
+            self.load_balancer[-1].out_features +
+            self.vae_mu.out_features +
+            self.meta_learner[-1].out_features
+        )
         self.fusion_layer = nn.Sequential(
-            nn.Linear(736, 512),
+            nn.Linear(self.fusion_input_dim, 512),
             nn.LayerNorm(512),
             nn.ReLU(),
             nn.Dropout(0.3),
@@ -550,28 +536,18 @@ def validate_swarm_coordination_efficiency(model, swarm_sizes=[5, 10, 20, 50, 10
     for size in swarm_sizes:
         print(f"Testing swarm size: {size}")
         
-        # Generate test scenarios for this swarm size
+        # Generate test scenarios for this swarm size (10 per type, stress beyond each type's range)
         test_scenarios = []
-        for scenario_type in ['simple', 'medium', 'complex']:
-            for _ in range(10):  # 10 scenarios per type
-                if scenario_type == 'simple' and size <= 10:
-                    feature = generator._generate_simple_scenario()
-                elif scenario_type == 'medium' and size <= 50:
-                    feature = generator._generate_medium_scenario()
-                elif scenario_type == 'complex' and size <= 200:
-                    feature = generator._generate_complex_scenario()
-                else:
-                    feature = generator._generate_stress_scenario()
-                
-                # Adjust num_agents feature to match swarm size
-                feature[0] = size / 500.0  # Normalize
-                test_scenarios.append(feature)
+        for scenario_type, max_size in (('simple', 10), ('medium', 50), ('complex', 200)):
+            features, _ = generator.generate_scenarios(scenario_type if size <= max_size else 'stress', 10)
+            test_scenarios.append(features)
+        test_scenarios = np.concatenate(test_scenarios)
+        
+        # Adjust num_agents feature to match swarm size
+        test_scenarios[:, 0] = size / 500.0  # Normalize
         
-        if not test_scenarios:
-            continue
-            
         # Evaluate model on test scenarios
-        test_features = torch.FloatTensor(test_scenarios)
+        test_features = torch.from_numpy(test_scenarios).float()
         
         with torch.no_grad():
             outputs = model(test_features)
@@ -702,6 +678,13 @@ def main_production():
     # Save final model with full state
     trainer.save_model('production_coordinator_weights.bin')
     
+    # Export inference builds
+    export_coordinator(
+        model, torch.FloatTensor(test_features_norm[:1]),
+        torchscript_path='/workspaces/ruv-FANN/ruv-swarm/models/swarm-coordinator/production_coordinator.pt',
+        onnx_path='/workspaces/ruv-FANN/ruv-swarm/models/swarm-coordinator/production_coordinator.onnx'
+    )
+    
     # Print comprehensive summary
     print("\n" + "=" * 60)
     print("✅ PRODUCTION TRAINING COMPLETED!")